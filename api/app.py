@@ -2,17 +2,98 @@
 Main Flask application for F1 Web App.
 """
 
-from flask import Flask, jsonify, render_template
+from flask import Flask, current_app, jsonify, render_template
 from flask_cors import CORS
+import atexit
 import logging
+import os
+import logging.handlers
+import queue
+from api.config import get_config
+from api.extensions import cache, compress, get_service
+from api.utils.converters import RaceConverter, DriverConverter, SessionConverter
+from api.utils.json_provider import OrjsonProvider
+
+def configure_logging(level):
+    """
+    Configure root logging so records are written by a background listener.
+    
+    Request threads only enqueue records; the blocking write to stderr
+    happens on the listener thread.
+    
+    Args:
+        level: Log level name or number for the root logger
+    """
+    log_queue = queue.SimpleQueue()
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+    
+    listener.start()
+    atexit.register(listener.stop)
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging(get_config().LOG_LEVEL)
 logger = logging.getLogger('f1webapp')
 
+def _create_session_service():
+    # Enabled here rather than in create_app, so workers that never load
+    # FastF1 data don't import fastf1 and pandas
+    from services.session_service import SessionService, enable_cache
+    os.makedirs(current_app.config['CACHE_DIR'], exist_ok=True)
+    enable_cache(current_app.config['CACHE_DIR'])
+    SessionService.max_cache_size = current_app.config['SESSION_CACHE_SIZE']
+    return SessionService
+
+def _create_schedule_service():
+    from services.schedule_service import ScheduleService
+    return ScheduleService()
+
+def _create_standings_service():
+    from services.standings_service import StandingsService
+    return StandingsService(session_service=get_service('session_service'))
+
+def _create_telemetry_service():
+    from services.telemetry_service import TelemetryService
+    return TelemetryService(session_service=get_service('session_service'))
+
+def _create_race_analysis_service():
+    from services.race_analysis_service import RaceAnalysisService
+    return RaceAnalysisService(session_service=get_service('session_service'))
+
+def _create_prediction_service():
+    from services.prediction_service import PredictionService
+    return PredictionService(
+        session_service=get_service('session_service'),
+        n_jobs=current_app.config['XGB_N_JOBS']
+    )
+
+def _create_train_queue():
+    # Train models on a background worker instead of the request thread; job
+    # state is kept next to the model so every server process can report it
+    from services.training_queue import TrainingQueue
+    prediction_service = get_service('prediction_service')
+    jobs_dir = os.path.join(os.path.dirname(prediction_service.model_path), 'training_jobs')
+    return TrainingQueue(prediction_service.train_model, jobs_dir)
+
+# Factories for the shared services, keyed by their get_service() name
+SERVICE_FACTORIES = {
+    'session_service': _create_session_service,
+    'schedule_service': _create_schedule_service,
+    'standings_service': _create_standings_service,
+    'telemetry_service': _create_telemetry_service,
+    'race_analysis_service': _create_race_analysis_service,
+    'prediction_service': _create_prediction_service,
+    'train_queue': _create_train_queue
+}
+
 def create_app():
     """
     Create and configure the Flask application.
@@ -21,10 +102,38 @@ def create_app():
         Flask: The configured Flask application
     """
     app = Flask(__name__)
+    app.config.from_object(get_config())
+    
+    # Serialize responses with orjson
+    app.json = OrjsonProvider(app)
+    
+    # Keep output compact and in insertion order, even in debug mode
+    app.json.sort_keys = False
+    app.json.compact = True
     
     # Enable CORS
     CORS(app)
     
+    # Enable response caching
+    cache.init_app(app)
+    
+    # Compress large responses (zstd, then Brotli, then gzip)
+    compress.init_app(app)
+    
+    # Routing: accept trailing slashes without a redirect and validate race, driver and session parameters
+    app.url_map.strict_slashes = False
+    app.url_map.converters['race'] = RaceConverter
+    app.url_map.converters['driver'] = DriverConverter
+    app.url_map.converters['session'] = SessionConverter
+    
+    # Services share one session cache and are built lazily on first use
+    app.extensions['service_factories'] = SERVICE_FACTORIES
+    
+    # Optionally warm the session cache with the latest events
+    if app.config['PREFETCH_EVENTS']:
+        with app.app_context():
+            get_service('session_service').prefetch_recent(app.config['PREFETCH_EVENTS'])
+    
     # Register blueprints
     from api.routes.telemetry import telemetry_bp
     from api.routes.race_analysis import race_analysis_bp
@@ -38,10 +147,12 @@ def create_app():
     app.register_blueprint(utils_bp, url_prefix='/api/utils')
     app.register_blueprint(predictions_bp, url_prefix='/api/predictions')
     
-    # Health check endpoint
+    # Health check endpoint; the payload never changes, so encode it once
+    health_body = app.json.dumps_bytes({'status': 'ok'})
+    
     @app.route('/health')
     def health_check():
-        return jsonify({'status': 'ok'})
+        return app.response_class(health_body, mimetype='application/json')
     
     # Error handlers
     @app.errorhandler(404)
@@ -50,7 +161,7 @@ def create_app():
     
     @app.errorhandler(500)
     def server_error(error):
-        logger.error(f"Server error: {error}")
+        logger.error("Server error: %s", error)
         return jsonify({'error': 'Internal server error'}), 500
     
     return app
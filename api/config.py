@@ -11,13 +11,43 @@ class Config:
     DEBUG = False
     TESTING = False
     
+    # Logging
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    
     # FastF1 settings
     CACHE_DIR = os.environ.get('F1_CACHE_DIR', 'cache')
     
+    # Number of loaded sessions kept in the shared SessionService cache
+    SESSION_CACHE_SIZE = int(os.environ.get('F1_SESSION_CACHE_SIZE', 40))
+    
+    # Threads XGBoost uses to train and predict; more than ~8 only adds contention on our small data sets
+    XGB_N_JOBS = int(os.environ.get('F1_XGB_N_JOBS', min(8, os.cpu_count() or 1)))
+    
+    # Number of most recent events whose race and qualifying are loaded at start-up (0 disables)
+    PREFETCH_EVENTS = int(os.environ.get('F1_PREFETCH_EVENTS', 0))
+    
+    # Response cache settings (Flask-Caching); uses Redis when a URL is configured
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_TYPE = 'RedisCache' if CACHE_REDIS_URL else 'SimpleCache'
+    CACHE_DEFAULT_TIMEOUT = 3600
+    
+    # Response compression settings (Flask-Compress); small bodies aren't worth the CPU
+    COMPRESS_ALGORITHM = ['zstd', 'br', 'gzip']
+    COMPRESS_MIMETYPES = ['application/json']
+    COMPRESS_MIN_SIZE = 16 * 1024
+    COMPRESS_ZSTD_LEVEL = 3
+    COMPRESS_BR_LEVEL = 4
+    # Flask-Compress buffers a streamed response whole to compress it, which
+    # defeats streaming; streamed responses go out uncompressed instead
+    COMPRESS_STREAMS = False
+    
     # File paths
     SCHEDULE_FILE = os.environ.get('F1_SCHEDULE_FILE', 'data/sched.csv')
     FLAGS_FILE = os.environ.get('F1_FLAGS_FILE', 'data/country_flags.json')
     
+    # Let the front proxy write files served with send_file() (X-Sendfile)
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+    
     # Plot settings
     DEFAULT_FIG_SIZE = (12, 8)
     DEFAULT_MINI_SECTORS = 20
@@ -36,8 +66,8 @@ class TestingConfig(Config):
 
 class ProductionConfig(Config):
     """Production configuration."""
-    # Production settings would go here
-    pass
+    # Only warnings and errors from request handlers in production
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING')
 
 
 # Dictionary of configurations
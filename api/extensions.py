@@ -0,0 +1,81 @@
+"""
+Flask extension instances for F1 Web App.
+
+Extensions are created here without an app and bound in ``create_app()``,
+so blueprints can import them without circular imports.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from flask_caching import Cache
+from flask_compress import Compress
+
+# Response cache for near-static GET endpoints
+cache = Cache()
+
+# Response compression for large JSON payloads
+compress = Compress()
+
+# Shared pool for blocking FastF1/pandas work, sized from the CPU count
+executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4), thread_name_prefix='f1webapp')
+
+# Guards lazy service construction; re-entrant because factories look up their dependencies
+_service_lock = threading.RLock()
+
+
+def cache_success_only(rv):
+    """
+    Response filter for ``cache.cached`` that skips error responses.
+    
+    Args:
+        rv: The view return value (a response or a (response, status) tuple)
+        
+    Returns:
+        bool: True if the response should be cached
+    """
+    if isinstance(rv, tuple):
+        return rv[1] == 200
+    return getattr(rv, 'status_code', 200) == 200
+
+
+def get_service(name):
+    """
+    Get a shared service instance registered on the current app.
+    
+    Services are built on first use from the factories in
+    ``app.extensions['service_factories']``, so a worker only imports
+    FastF1/pandas once a request actually needs them.
+    
+    Args:
+        name: The extension key (e.g. 'session_service')
+        
+    Returns:
+        The service instance
+    """
+    extensions = current_app.extensions
+    service = extensions.get(name)
+    if service is None:
+        with _service_lock:
+            service = extensions.get(name)
+            if service is None:
+                service = extensions['service_factories'][name]()
+                extensions[name] = service
+    return service
+
+
+async def run_blocking(func, *args):
+    """
+    Run a blocking call on the shared executor without blocking the event loop.
+    
+    Args:
+        func: The function to call
+        *args: Positional arguments for func
+        
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
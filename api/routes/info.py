@@ -3,22 +3,36 @@ API routes for F1 information data.
 """
 
 import logging
-from datetime import datetime, timedelta
-from flask import Blueprint, jsonify, request
-from services.schedule_service import ScheduleService
-from services.standings_service import StandingsService
-from api.utils.response import create_response
+from datetime import datetime
+from flask import Blueprint, request
+from api.extensions import cache, cache_success_only, get_service
+from api.utils.response import create_response, make_conditional
+from api.utils.error_handler import configure_error_handling, route_errors
+from api.utils.validation import parse_year
 
 logger = logging.getLogger('f1webapp')
 
 # Create Blueprint
 info_bp = Blueprint('info', __name__)
 
-# Initialize services
-schedule_service = ScheduleService()
-standings_service = StandingsService()
+# Configure error handling
+configure_error_handling(info_bp)
+
+# Standings change at most once per race weekend, so polling clients can revalidate
+CONDITIONAL_ENDPOINTS = {'info.get_drivers', 'info.get_constructors'}
+
+@info_bp.after_request
+def add_standings_etag(response):
+    """
+    Add an ETag to standings responses and short-circuit unchanged ones to 304.
+    """
+    if request.endpoint in CONDITIONAL_ENDPOINTS and response.status_code == 200:
+        return make_conditional(response, max_age=3600)
+    return response
 
 @info_bp.route('/schedule', methods=['GET'])
+@cache.cached(timeout=3600, query_string=True, response_filter=cache_success_only)
+@route_errors("getting schedule")
 def get_schedule():
     """
     Get the F1 schedule.
@@ -30,20 +44,15 @@ def get_schedule():
     Returns:
         JSON: Schedule data
     """
-    try:
-        year = request.args.get('year')
-        include_testing = request.args.get('include_testing', 'false').lower() == 'true'
-        
-        if year:
-            year = int(year)
-            
-        schedule_data = schedule_service.get_schedule(year, include_testing)
-        return create_response(schedule_data)
-    except Exception as e:
-        logger.error(f"Error getting schedule: {e}")
-        return create_response({"error": str(e)}, 500)
+    year = parse_year(request.args.get('year'))
+    include_testing = request.args.get('include_testing', 'false').lower() == 'true'
+    
+    schedule_data = get_service('schedule_service').get_schedule(year, include_testing)
+    return create_response(schedule_data)
 
 @info_bp.route('/next-event', methods=['GET'])
+@cache.cached(timeout=3600, query_string=True, response_filter=cache_success_only)
+@route_errors("getting next event")
 def get_next_event():
     """
     Get the next upcoming F1 event.
@@ -51,14 +60,12 @@ def get_next_event():
     Returns:
         JSON: Next event data
     """
-    try:
-        next_event = schedule_service.get_next_event()
-        return create_response(next_event)
-    except Exception as e:
-        logger.error(f"Error getting next event: {e}")
-        return create_response({"error": str(e)}, 500)
+    next_event = get_service('schedule_service').get_next_event()
+    return create_response(next_event)
 
 @info_bp.route('/drivers', methods=['GET'])
+@cache.cached(timeout=3600, query_string=True, response_filter=cache_success_only)
+@route_errors("getting driver standings")
 def get_drivers():
     """
     Get driver standings.
@@ -69,18 +76,13 @@ def get_drivers():
     Returns:
         JSON: Driver standings data
     """
-    try:
-        year = request.args.get('year')
-        if year:
-            year = int(year)
-            
-        driver_standings = standings_service.get_driver_standings(year)
-        return create_response(driver_standings)
-    except Exception as e:
-        logger.error(f"Error getting driver standings: {e}")
-        return create_response({"error": str(e)}, 500)
+    year = parse_year(request.args.get('year'))
+    
+    driver_standings = get_service('standings_service').get_driver_standings(year)
+    return create_response(driver_standings)
 
 @info_bp.route('/all-drivers', methods=['GET'])
+@route_errors("getting all drivers")
 def get_all_drivers():
     """
     Get all drivers for a given year.
@@ -91,18 +93,14 @@ def get_all_drivers():
     Returns:
         JSON: List of drivers
     """
-    try:
-        year = request.args.get('year')
-        if year:
-            year = int(year)
-            
-        drivers = standings_service.get_all_drivers(year)
-        return create_response(drivers)
-    except Exception as e:
-        logger.error(f"Error getting all drivers: {e}")
-        return create_response({"error": str(e)}, 500)
+    year = parse_year(request.args.get('year'))
+    
+    drivers = get_service('standings_service').get_all_drivers(year)
+    return create_response(drivers)
 
 @info_bp.route('/races', methods=['GET'])
+@cache.cached(timeout=3600, query_string=True, response_filter=cache_success_only)
+@route_errors("getting all races")
 def get_races():
     """
     Get all races for a given year.
@@ -113,18 +111,14 @@ def get_races():
     Returns:
         JSON: List of races
     """
-    try:
-        year = request.args.get('year')
-        if year:
-            year = int(year)
-        
-        schedule = schedule_service.get_schedule(year)
-        return create_response(schedule)
-    except Exception as e:
-        logger.error(f"Error getting all races: {e}")
-        return create_response({"error": str(e)}, 500)
+    year = parse_year(request.args.get('year'))
+    
+    schedule = get_service('schedule_service').get_schedule(year)
+    return create_response(schedule)
 
 @info_bp.route('/constructors', methods=['GET'])
+@cache.cached(timeout=3600, query_string=True, response_filter=cache_success_only)
+@route_errors("getting constructor standings")
 def get_constructors():
     """
     Get constructor standings.
@@ -135,18 +129,14 @@ def get_constructors():
     Returns:
         JSON: Constructor standings data
     """
-    try:
-        year = request.args.get('year')
-        if year:
-            year = int(year)
-            
-        constructor_standings = standings_service.get_constructor_standings(year)
-        return create_response(constructor_standings)
-    except Exception as e:
-        logger.error(f"Error getting constructor standings: {e}")
-        return create_response({"error": str(e)}, 500)
+    year = parse_year(request.args.get('year'))
+    
+    constructor_standings = get_service('standings_service').get_constructor_standings(year)
+    return create_response(constructor_standings)
 
 @info_bp.route('/events-by-status', methods=['GET'])
+@cache.cached(timeout=300, query_string=True, response_filter=cache_success_only)
+@route_errors("getting events by status")
 def get_events_by_status():
     """
     Get F1 events grouped by status (past, current, future).
@@ -157,53 +147,7 @@ def get_events_by_status():
     Returns:
         JSON: Events grouped by status
     """
-    try:
-        year = request.args.get('year')
-        if year:
-            year = int(year)
-        else:
-            year = datetime.now().year
-            
-        # Get the schedule
-        schedule_data = schedule_service.get_schedule(year)
-        
-        # Group events by status
-        past_events = []
-        current_events = []
-        future_events = []
-        
-        now = datetime.now()
-        
-        for race in schedule_data.get('races', []):
-            # Get the race date from the first event (usually FP1)
-            events = race.get('events', [])
-            if not events:
-                continue
-                
-            # Sort events by start time
-            events.sort(key=lambda x: x['startTime'])
-            
-            # Get the first and last event times
-            first_event_time = datetime.fromisoformat(events[0]['startTime'])
-            last_event_time = datetime.fromisoformat(events[-1]['startTime'])
-            
-            # Determine status based on event times
-            if last_event_time < now - timedelta(days=1):
-                race['status'] = 'past'
-                past_events.append(race)
-            elif first_event_time <= now + timedelta(days=2):
-                race['status'] = 'current'
-                current_events.append(race)
-            else:
-                race['status'] = 'future'
-                future_events.append(race)
-        
-        return create_response({
-            'year': year,
-            'past': past_events,
-            'current': current_events,
-            'future': future_events
-        })
-    except Exception as e:
-        logger.error(f"Error getting events by status: {e}")
-        return create_response({"error": str(e)}, 500)
+    year = parse_year(request.args.get('year')) or datetime.now().year
+    
+    events_by_status = get_service('schedule_service').get_events_by_status(year)
+    return create_response(events_by_status)
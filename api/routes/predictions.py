@@ -3,54 +3,111 @@ API routes for predictions.
 """
 
 from flask import Blueprint, request, jsonify
-from services.prediction_service import PredictionService
-from services.session_service import SessionService
+from api.extensions import get_service
 from api.routes.utils import format_lap_time
+from api.utils.response import error_response
+from api.utils.error_handler import configure_error_handling, route_errors
+from api.utils.validation import is_value_list, parse_year
 import logging
 
 logger = logging.getLogger('f1webapp')
+
+# Most items a single batch prediction request may contain
+MAX_BATCH_SIZE = 50
+
 predictions_bp = Blueprint('predictions_bp', __name__)
 
-prediction_service = PredictionService()
+# Configure error handling
+configure_error_handling(predictions_bp)
 
 @predictions_bp.route('/predict/qualifying_time', methods=['GET'])
+@route_errors("predicting lap time")
 def predict_qualifying_time():
     """
     Predict the qualifying lap time for a given driver.
     """
-    year = request.args.get('year')
+    year = parse_year(request.args.get('year'))
     race = request.args.get('race')
     driver = request.args.get('driver')
 
     if not all([year, race, driver]):
-        return jsonify({"error": "Missing required parameters: year, race, driver"}), 400
-
-    try:
-        prediction_seconds = prediction_service.predict_lap_time(int(year), race, driver)
-        formatted_time = format_lap_time(prediction_seconds)
-        return jsonify({
-            "predicted_lap_time_seconds": prediction_seconds,
-            "predicted_lap_time_formatted": formatted_time
-        })
-    except Exception as e:
-        logger.error(f"Error predicting lap time: {e}")
-        return jsonify({"error": str(e)}), 500
+        return error_response("Missing required parameters: year, race, driver", 400)
+
+    prediction_seconds = get_service('prediction_service').predict_lap_time(year, race, driver)
+    formatted_time = format_lap_time(prediction_seconds)
+    return jsonify({
+        "predicted_lap_time_seconds": prediction_seconds,
+        "predicted_lap_time_formatted": formatted_time
+    })
+
+@predictions_bp.route('/predict/qualifying_time/batch', methods=['POST'])
+@route_errors("predicting lap times")
+def predict_qualifying_time_batch():
+    """
+    Predict qualifying lap times for several (year, race, driver) items in one request.
+    
+    Expects a JSON body of the form {"items": [{"year": ..., "race": ..., "driver": ...}]}
+    and returns one result per item, in order; an item that cannot be predicted
+    gets a generic "error" entry (the cause is logged) instead of failing the
+    whole batch.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+
+    if not isinstance(items, list) or not items:
+        return error_response("Missing required parameter: items", 400)
+
+    if len(items) > MAX_BATCH_SIZE:
+        return error_response(f"Too many items: at most {MAX_BATCH_SIZE} per batch", 400)
+
+    prediction_service = get_service('prediction_service')
+    predictions = []
+    for item in items:
+        if not isinstance(item, dict):
+            item = {}
+        year = item.get('year')
+        race = item.get('race')
+        driver = item.get('driver')
+        result = {"year": year, "race": race, "driver": driver}
+
+        if not all([year, race, driver]):
+            result["error"] = "Missing required parameters: year, race, driver"
+        else:
+            try:
+                prediction_seconds = prediction_service.predict_lap_time(int(year), race, driver)
+                result["predicted_lap_time_seconds"] = prediction_seconds
+                result["predicted_lap_time_formatted"] = format_lap_time(prediction_seconds)
+            except Exception as e:
+                logger.error("Error predicting lap time for %s %s %s: %s", year, race, driver, e, exc_info=True)
+                result["error"] = "Error predicting lap time"
+
+        predictions.append(result)
+
+    return jsonify({"predictions": predictions})
 
 @predictions_bp.route('/train/qualifying_time_model', methods=['POST'])
+@route_errors("queueing model training")
 def train_qualifying_time_model():
     """
     Train the qualifying lap time prediction model.
     """
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     years = data.get('years')
     races = data.get('races')
 
-    if not all([years, races]):
-        return jsonify({"error": "Missing required parameters: years, races"}), 400
+    if not is_value_list(years) or not is_value_list(races):
+        return error_response("Parameters years and races must be non-empty lists", 400)
 
-    try:
-        prediction_service.train_model(years, races)
-        return jsonify({"message": "Model training initiated."})
-    except Exception as e:
-        logger.error(f"Error training model: {e}")
-        return jsonify({"error": str(e)}), 500
+    job_id = get_service('train_queue').submit(years, races)
+    return jsonify({"message": "Model training queued.", "job_id": job_id}), 202
+
+@predictions_bp.route('/train/status/<job_id>', methods=['GET'])
+@route_errors("getting training status for {job_id}")
+def get_training_status(job_id):
+    """
+    Get the status of a model training job.
+    """
+    job = get_service('train_queue').get_job(job_id)
+    if job is None:
+        return error_response(f"Unknown training job: {job_id}", 404)
+    return jsonify(job)
@@ -2,13 +2,14 @@
 Race analysis routes for F1 Web App API.
 """
 
-from flask import Blueprint, request, send_file
+from flask import Blueprint, request
 import logging
-import os
-from api.utils.response import success_response, error_response
-from api.utils.error_handler import APIError, configure_error_handling
-from services.session_service import SessionService
-from services.race_analysis_service import RaceAnalysisService
+from api.utils.response import (
+    success_response, stream_success_response, error_response, add_cache_headers, max_age_for_year
+)
+from api.utils.validation import parse_driver_list
+from api.utils.error_handler import APIError, configure_error_handling, route_errors
+from api.extensions import get_service, run_blocking
 
 # Create blueprint
 race_analysis_bp = Blueprint('race_analysis', __name__)
@@ -17,12 +18,36 @@ logger = logging.getLogger('f1webapp')
 # Configure error handling
 configure_error_handling(race_analysis_bp)
 
-# Create shared service instances for better caching
-race_analysis_service = RaceAnalysisService()
 
+@race_analysis_bp.after_request
+def add_race_analysis_cache_headers(response):
+    """
+    Add caching headers to race analysis responses; past seasons are cached for a year.
+    """
+    if response.status_code == 200:
+        return add_cache_headers(response, max_age_for_year((request.view_args or {}).get('year')))
+    return response
+
+
+async def _get_session(year, race, session_type):
+    """
+    Load a session on the shared pool without blocking the event loop.
+    
+    Args:
+        year: Year of the session
+        race: Race name or round number
+        session_type: Session type (e.g., 'R', 'Q', 'FP1')
+        
+    Returns:
+        fastf1.core.Session: The loaded session
+    """
+    race_analysis_service = get_service('race_analysis_service')
+    return await run_blocking(race_analysis_service.get_session, year, race, session_type)
 
-@race_analysis_bp.route('/race-pace/<int:year>/<race>', methods=['GET'])
-def get_race_pace(year, race):
+
+@race_analysis_bp.route('/race-pace/<int:year>/<race:race>', methods=['GET'])
+@route_errors("getting race pace data")
+async def get_race_pace(year, race):
     """
     Get race pace comparison data.
     
@@ -33,25 +58,21 @@ def get_race_pace(year, race):
     Returns:
         JSON: Race pace data
     """
-    try:
-        # Get optional parameters
-        num_drivers = request.args.get('drivers', default=10, type=int)
-        
-        logger.info(f"Getting race pace data for {year} {race} (top {num_drivers} drivers)")
-        
-        # Use the shared race_analysis_service instance
-        session = race_analysis_service.get_session(year, race, 'R')
-        data = race_analysis_service.get_race_pace_data(session, num_drivers)
-        
-        return success_response(data)
-        
-    except Exception as e:
-        logger.error(f"Error getting race pace data: {e}")
-        return error_response(f"Error getting race pace data: {str(e)}", 500)
+    # Get optional parameters
+    num_drivers = request.args.get('drivers', default=10, type=int)
+    
+    logger.info("Getting race pace data for %s %s (top %s drivers)", year, race, num_drivers)
+    
+    # Load the session and build the data on the shared pool
+    session = await _get_session(year, race, 'R')
+    data = await run_blocking(get_service('race_analysis_service').get_race_pace_data, session, num_drivers)
+    
+    return stream_success_response(data, 'drivers')
 
 
-@race_analysis_bp.route('/team-pace/<int:year>/<race>', methods=['GET'])
-def get_team_pace(year, race):
+@race_analysis_bp.route('/team-pace/<int:year>/<race:race>', methods=['GET'])
+@route_errors("getting team pace data")
+async def get_team_pace(year, race):
     """
     Get team pace comparison data.
     
@@ -62,22 +83,18 @@ def get_team_pace(year, race):
     Returns:
         JSON: Team pace data
     """
-    try:
-        logger.info(f"Getting team pace data for {year} {race}")
-        
-        # Use the shared race_analysis_service instance
-        session = race_analysis_service.get_session(year, race, 'R')
-        data = race_analysis_service.get_team_pace_data(session)
-        
-        return success_response(data)
-        
-    except Exception as e:
-        logger.error(f"Error getting team pace data: {e}")
-        return error_response(f"Error getting team pace data: {str(e)}", 500)
+    logger.info("Getting team pace data for %s %s", year, race)
+    
+    # Load the session and build the data on the shared pool
+    session = await _get_session(year, race, 'R')
+    data = await run_blocking(get_service('race_analysis_service').get_team_pace_data, session)
+    
+    return success_response(data)
 
 
-@race_analysis_bp.route('/lap-sections/<int:year>/<race>/<session>', methods=['GET'])
-def get_lap_sections(year, race, session):
+@race_analysis_bp.route('/lap-sections/<int:year>/<race:race>/<session:session>', methods=['GET'])
+@route_errors("getting lap sections data")
+async def get_lap_sections(year, race, session):
     """
     Get lap sections analysis data.
     
@@ -89,19 +106,16 @@ def get_lap_sections(year, race, session):
     Returns:
         JSON: Lap sections data
     """
-    try:
-        # Get drivers from query parameters
-        drivers = request.args.get('drivers', '')
-        driver_list = drivers.split(',') if drivers else []
-        
-        logger.info(f"Getting lap sections data for {year} {race} {session} {driver_list}")
-        
-        # Use the shared race_analysis_service instance
-        session_obj = race_analysis_service.get_session(year, race, session)
-        data = race_analysis_service.get_lap_sections_data(session_obj, driver_list)
-        
-        return success_response(data)
-        
-    except Exception as e:
-        logger.error(f"Error getting lap sections data: {e}")
-        return error_response(f"Error getting lap sections data: {str(e)}", 500)
+    # Get drivers from query parameters
+    drivers = request.args.get('drivers', '')
+    driver_list = parse_driver_list(drivers) if drivers else []
+    if drivers and not driver_list:
+        return error_response(f"Invalid driver codes: {drivers}", 400)
+    
+    logger.info("Getting lap sections data for %s %s %s %s", year, race, session, driver_list)
+    
+    # Load the session and build the data on the shared pool
+    session_obj = await _get_session(year, race, session)
+    data = await run_blocking(get_service('race_analysis_service').get_lap_sections_data, session_obj, driver_list)
+    
+    return stream_success_response(data, 'sections')
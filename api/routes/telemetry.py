@@ -2,12 +2,16 @@
 Telemetry routes for F1 Web App API.
 """
 
-from flask import Blueprint, request
+import asyncio
+from flask import Blueprint, Response, g, request
 import logging
-from api.utils.response import success_response, error_response
-from api.utils.error_handler import APIError, configure_error_handling
-from services.session_service import SessionService
-from services.telemetry_service import TelemetryService
+from api.utils.response import (
+    success_response, stream_success_response, ndjson_response, error_response,
+    add_cache_headers, max_age_for_year, data_etag
+)
+from api.utils.validation import parse_driver_list
+from api.utils.error_handler import APIError, configure_error_handling, route_errors
+from api.extensions import cache, cache_success_only, get_service, run_blocking
 
 # Create blueprint
 telemetry_bp = Blueprint('telemetry', __name__)
@@ -16,12 +20,56 @@ logger = logging.getLogger('f1webapp')
 # Configure error handling
 configure_error_handling(telemetry_bp)
 
-# Create shared service instances for better caching
-telemetry_service = TelemetryService()
+# Telemetry response format version, part of every ETag; bump it when a payload changes shape
+ETAG_VERSION = 1
 
+# Endpoints whose responses don't come from FastF1 data
+UNCACHED_ENDPOINTS = {'telemetry.get_pool_health'}
 
-@telemetry_bp.route('/speed-trace/<int:year>/<race>/<session>/<driver1>/<driver2>', methods=['GET'])
-def get_speed_trace(year, race, session, driver1, driver2):
+
+def _max_age():
+    """Get the Cache-Control max-age for the requested season."""
+    year = (request.view_args or {}).get('year', request.args.get('year', type=int))
+    return max_age_for_year(year)
+
+
+@telemetry_bp.before_request
+def check_telemetry_etag():
+    """
+    Answer 304 Not Modified before any session is loaded when the client's copy is current.
+    
+    The ETag is derived from the request and FastF1's cache file, not from the
+    response body, so an unchanged response is never built just to be hashed.
+    """
+    if request.method != 'GET' or request.endpoint in UNCACHED_ENDPOINTS:
+        return None
+    
+    g.telemetry_etag = data_etag(request.full_path, ETAG_VERSION)
+    if request.if_none_match.contains(g.telemetry_etag):
+        response = Response(status=304)
+        response.set_etag(g.telemetry_etag)
+        return add_cache_headers(response, _max_age())
+    return None
+
+
+@telemetry_bp.after_request
+def add_telemetry_cache_headers(response):
+    """
+    Add the ETag and caching headers to telemetry responses.
+    
+    Past seasons are cached for a year; the current season only briefly.
+    """
+    etag = g.get('telemetry_etag')
+    if response.status_code != 200 or etag is None:
+        return response
+    
+    response.set_etag(etag)
+    return add_cache_headers(response, _max_age())
+
+
+@telemetry_bp.route('/speed-trace/<int:year>/<race:race>/<session:session>/<driver:driver1>/<driver:driver2>', methods=['GET'])
+@route_errors("getting speed trace data")
+async def get_speed_trace(year, race, session, driver1, driver2):
     """
     Get speed trace comparison data for two drivers.
     
@@ -35,22 +83,19 @@ def get_speed_trace(year, race, session, driver1, driver2):
     Returns:
         JSON: Speed trace data
     """
-    try:
-        logger.info(f"Getting speed trace data for {year} {race} {session} {driver1} vs {driver2}")
-        
-        # Use the shared telemetry service instance
-        session_obj = telemetry_service.get_session(year, race, session)
-        data = telemetry_service.get_speed_trace_data(session_obj, driver1, driver2)
-        
-        return success_response(data)
-        
-    except Exception as e:
-        logger.error(f"Error getting speed trace data: {e}")
-        return error_response(f"Error getting speed trace data: {str(e)}", 500)
+    logger.info("Getting speed trace data for %s %s %s %s vs %s", year, race, session, driver1, driver2)
+    
+    # Load and process on worker threads so the event loop stays free
+    telemetry_service = get_service('telemetry_service')
+    session_obj = await run_blocking(telemetry_service.get_session, year, race, session)
+    data = await run_blocking(telemetry_service.get_speed_trace_data, session_obj, driver1, driver2)
+    
+    return success_response(data)
 
 
-@telemetry_bp.route('/gear-shifts/<int:year>/<race>/<session>/<driver>', methods=['GET'])
-def get_gear_shifts(year, race, session, driver):
+@telemetry_bp.route('/gear-shifts/<int:year>/<race:race>/<session:session>/<driver:driver>', methods=['GET'])
+@route_errors("getting gear shift data")
+async def get_gear_shifts(year, race, session, driver):
     """
     Get gear shift data for a driver.
     
@@ -63,22 +108,19 @@ def get_gear_shifts(year, race, session, driver):
     Returns:
         JSON: Gear shift data
     """
-    try:
-        logger.info(f"Getting gear shift data for {year} {race} {session} {driver}")
-        
-        # Use the shared telemetry service instance
-        session_obj = telemetry_service.get_session(year, race, session)
-        data = telemetry_service.get_gear_shifts_data(session_obj, driver)
-        
-        return success_response(data)
-        
-    except Exception as e:
-        logger.error(f"Error getting gear shift data: {e}")
-        return error_response(f"Error getting gear shift data: {str(e)}", 500)
+    logger.info("Getting gear shift data for %s %s %s %s", year, race, session, driver)
+    
+    # Load and process on worker threads so the event loop stays free
+    telemetry_service = get_service('telemetry_service')
+    session_obj = await run_blocking(telemetry_service.get_session, year, race, session)
+    data = await run_blocking(telemetry_service.get_gear_shifts_data, session_obj, driver)
+    
+    return success_response(data)
 
 
-@telemetry_bp.route('/track-dominance/<int:year>/<race>/<session>', methods=['GET'])
-def get_track_dominance(year, race, session):
+@telemetry_bp.route('/track-dominance/<int:year>/<race:race>/<session:session>', methods=['GET'])
+@route_errors("getting track dominance data")
+async def get_track_dominance(year, race, session):
     """
     Get track dominance data for drivers.
     
@@ -90,27 +132,27 @@ def get_track_dominance(year, race, session):
     Returns:
         JSON: Track dominance data
     """
-    try:
-        # Get drivers from query parameters
-        drivers = request.args.get('drivers', '')
-        driver_list = drivers.split(',') if drivers else []
-        
-        logger.info(f"Getting track dominance data for {year} {race} {session} {driver_list}")
-        
-        # Use the shared telemetry service instance
-        session_obj = telemetry_service.get_session(year, race, session)
-        data = telemetry_service.get_track_dominance_data(session_obj, driver_list)
-        
-        return success_response(data)
-        
-    except Exception as e:
-        logger.error(f"Error getting track dominance data: {e}")
-        return error_response(f"Error getting track dominance data: {str(e)}", 500)
+    # Get drivers from query parameters
+    drivers = request.args.get('drivers', '')
+    driver_list = parse_driver_list(drivers) if drivers else []
+    if drivers and not driver_list:
+        return error_response(f"Invalid driver codes: {drivers}", 400)
+    
+    logger.info("Getting track dominance data for %s %s %s %s", year, race, session, driver_list)
+    
+    # Load and process on worker threads so the event loop stays free
+    telemetry_service = get_service('telemetry_service')
+    session_obj = await run_blocking(telemetry_service.get_session, year, race, session)
+    data = await run_blocking(telemetry_service.get_track_dominance_data, session_obj, driver_list)
+    
+    return stream_success_response(data, 'miniSectors')
 
 
 # Session picker routes
 
 @telemetry_bp.route('/years', methods=['GET'])
+@cache.cached(timeout=3600, response_filter=cache_success_only)
+@route_errors("getting available years")
 def get_available_years():
     """
     Get all available years from 2018 to present.
@@ -118,20 +160,56 @@ def get_available_years():
     Returns:
         JSON: List of available years
     """
-    try:
-        logger.info("Getting available years")
-        
-        # Use the shared session service instance
-        years = SessionService.get_available_years()
-        
-        return success_response({"years": years})
+    logger.info("Getting available years")
+    
+    # Use the shared session service instance
+    session_service = get_service('session_service')
+    years = session_service.get_available_years()
+    
+    return success_response({"years": years})
+
+
+@telemetry_bp.route('/bootstrap', methods=['GET'])
+@route_errors("getting session bootstrap data")
+async def get_session_bootstrap():
+    """
+    Get all session picker data in one call.
+    
+    Each level is only included when the query parameters it depends on
+    are given, so the frontend can fill its pickers with a single request.
+    
+    Query Parameters:
+        year: Optional year to include events for
+        race: Optional race (with year) to include session types for
+        session: Optional session type (with year and race) to include drivers for
         
-    except Exception as e:
-        logger.error(f"Error getting available years: {e}")
-        return error_response(f"Error getting available years: {str(e)}", 500)
+    Returns:
+        JSON: Years, and optionally events, sessions and drivers
+    """
+    year = request.args.get('year', type=int)
+    race = request.args.get('race')
+    session = request.args.get('session')
+    
+    logger.info("Getting session bootstrap data for %s %s %s", year, race, session)
+    
+    # Use the shared session service instance
+    session_service = get_service('session_service')
+    
+    # Run the lookups on the shared pool together, without holding a thread to wait on them
+    calls = {'years': run_blocking(session_service.get_available_years)}
+    if year is not None:
+        calls['events'] = run_blocking(session_service.get_events_for_year, year)
+        if race:
+            calls['sessions'] = run_blocking(session_service.get_session_types, year, race)
+            if session:
+                calls['drivers'] = run_blocking(session_service.get_drivers_in_session, year, race, session)
+    
+    results = await asyncio.gather(*calls.values())
+    return success_response(dict(zip(calls, results)))
 
 
 @telemetry_bp.route('/events/<int:year>', methods=['GET'])
+@route_errors("getting events for year {year}")
 def get_events_for_year(year):
     """
     Get all events (races) for a specific year.
@@ -142,20 +220,17 @@ def get_events_for_year(year):
     Returns:
         JSON: List of events
     """
-    try:
-        logger.info(f"Getting events for year {year}")
-        
-        # Use the shared session service instance
-        events = SessionService.get_events_for_year(year)
-        
-        return success_response({"events": events})
-        
-    except Exception as e:
-        logger.error(f"Error getting events for year {year}: {e}")
-        return error_response(f"Error getting events for year {year}: {str(e)}", 500)
+    logger.info("Getting events for year %s", year)
+    
+    # Use the shared session service instance
+    session_service = get_service('session_service')
+    events = session_service.get_events_for_year(year)
+    
+    return success_response({"events": events})
 
 
-@telemetry_bp.route('/sessions/<int:year>/<race>', methods=['GET'])
+@telemetry_bp.route('/sessions/<int:year>/<race:race>', methods=['GET'])
+@route_errors("getting session types for {year} {race}")
 def get_session_types(year, race):
     """
     Get available session types for a specific event.
@@ -167,20 +242,17 @@ def get_session_types(year, race):
     Returns:
         JSON: List of session types
     """
-    try:
-        logger.info(f"Getting session types for {year} {race}")
-        
-        # Use the shared session service instance
-        sessions = SessionService.get_session_types(year, race)
-        
-        return success_response({"sessions": sessions})
-        
-    except Exception as e:
-        logger.error(f"Error getting session types for {year} {race}: {e}")
-        return error_response(f"Error getting session types for {year} {race}: {str(e)}", 500)
+    logger.info("Getting session types for %s %s", year, race)
+    
+    # Use the shared session service instance
+    session_service = get_service('session_service')
+    sessions = session_service.get_session_types(year, race)
+    
+    return success_response({"sessions": sessions})
 
 
-@telemetry_bp.route('/drivers/<int:year>/<race>/<session>', methods=['GET'])
+@telemetry_bp.route('/drivers/<int:year>/<race:race>/<session:session>', methods=['GET'])
+@route_errors("getting drivers for {year} {race} {session}")
 def get_drivers_in_session(year, race, session):
     """
     Get all drivers who participated in a specific session.
@@ -193,20 +265,17 @@ def get_drivers_in_session(year, race, session):
     Returns:
         JSON: List of drivers
     """
-    try:
-        logger.info(f"Getting drivers for {year} {race} {session}")
-        
-        # Use the shared session service instance
-        drivers = SessionService.get_drivers_in_session(year, race, session)
-        
-        return success_response({"drivers": drivers})
-        
-    except Exception as e:
-        logger.error(f"Error getting drivers for {year} {race} {session}: {e}")
-        return error_response(f"Error getting drivers for {year} {race} {session}: {str(e)}", 500)
+    logger.info("Getting drivers for %s %s %s", year, race, session)
+    
+    # Use the shared session service instance
+    session_service = get_service('session_service')
+    drivers = session_service.get_drivers_in_session(year, race, session)
+    
+    return success_response({"drivers": drivers})
 
 
-@telemetry_bp.route('/laps/<int:year>/<race>/<session>/<driver>', methods=['GET'])
+@telemetry_bp.route('/laps/<int:year>/<race:race>/<session:session>/<driver:driver>', methods=['GET'])
+@route_errors("getting laps for {driver} in {year} {race} {session}")
 def get_driver_laps(year, race, session, driver):
     """
     Get all laps for a specific driver in a session.
@@ -220,20 +289,17 @@ def get_driver_laps(year, race, session, driver):
     Returns:
         JSON: List of laps
     """
-    try:
-        logger.info(f"Getting laps for {driver} in {year} {race} {session}")
-        
-        # Use the shared session service instance
-        laps = SessionService.get_driver_laps(year, race, session, driver)
-        
-        return success_response({"laps": laps})
-        
-    except Exception as e:
-        logger.error(f"Error getting laps for {driver} in {year} {race} {session}: {e}")
-        return error_response(f"Error getting laps for {driver} in {year} {race} {session}: {str(e)}", 500)
+    logger.info("Getting laps for %s in %s %s %s", driver, year, race, session)
+    
+    # Use the shared session service instance
+    session_service = get_service('session_service')
+    laps = session_service.get_driver_laps(year, race, session, driver)
+    
+    return success_response({"laps": laps})
 
-@telemetry_bp.route('/session-laps/<int:year>/<race>/<session>', methods=['GET'])
-def get_session_laps(year, race, session):
+@telemetry_bp.route('/session-laps/<int:year>/<race:race>/<session:session>', methods=['GET'])
+@route_errors("getting all laps for {year} {race} {session}")
+async def get_session_laps(year, race, session):
     """
     Get all laps for a given session.
     
@@ -242,18 +308,37 @@ def get_session_laps(year, race, session):
         race: The name of the event
         session: The session type code
         
+    Query Parameters:
+        format: Optional 'ndjson' to stream one lap per line
+        
     Returns:
         JSON: List of laps
     """
-    try:
-        logger.info(f"Getting all laps for {year} {race} {session}")
-        
-        # Use the shared telemetry service instance
-        session_obj = telemetry_service.get_session(year, race, session)
-        laps = telemetry_service.get_all_laps(session_obj)
-        
-        return success_response(laps)
-        
-    except Exception as e:
-        logger.error(f"Error getting all laps for {year} {race} {session}: {e}")
-        return error_response(f"Error getting all laps for {year} {race} {session}: {str(e)}", 500)
+    logger.info("Getting all laps for %s %s %s", year, race, session)
+    
+    # Load and process on worker threads so the event loop stays free
+    telemetry_service = get_service('telemetry_service')
+    session_obj = await run_blocking(telemetry_service.get_session, year, race, session)
+    laps = await run_blocking(telemetry_service.get_all_laps, session_obj)
+    
+    # Clients that parse incrementally can ask for one lap per line
+    if request.args.get('format') == 'ndjson':
+        return ndjson_response(laps['laps'])
+    
+    return stream_success_response(laps, 'laps')
+
+
+@telemetry_bp.route('/pool-health', methods=['GET'])
+@route_errors("getting session pool health")
+def get_pool_health():
+    """
+    Get usage statistics for the shared session cache.
+    
+    Returns:
+        JSON: Session cache size, hit rate, evictions and load times
+    """
+    # Use the shared session service instance
+    session_service = get_service('session_service')
+    stats = session_service.get_stats()
+    
+    return success_response(stats)
@@ -2,10 +2,13 @@
 Utility API routes for the F1 Web App.
 """
 
-from flask import Blueprint, request, jsonify
-from api.utils.response import create_response
+from flask import Blueprint, request
+from api.utils.response import create_response, error_response
+from api.utils.error_handler import configure_error_handling, route_errors
+from api.utils.validation import parse_year
+from api.extensions import cache, cache_success_only
 from utils.color_mapping import get_driver_color, get_team_color, get_color_mapping
-from datetime import timedelta
+from functools import lru_cache
 
 def format_lap_time(seconds):
     """
@@ -13,16 +16,27 @@ def format_lap_time(seconds):
     """
     if seconds is None:
         return None
-    delta = timedelta(seconds=seconds)
-    minutes = delta.seconds // 60
-    seconds_val = delta.seconds % 60
-    milliseconds = delta.microseconds // 1000
-    return f"{minutes:01d}:{seconds_val:02d}.{milliseconds:03d}"
+    # Quantize to whole (truncated) milliseconds so repeated times hit the cache
+    return _format_lap_time_ms(round(seconds * 1_000_000) // 1000)
+
+@lru_cache(maxsize=32768)
+def _format_lap_time_ms(milliseconds):
+    """
+    Format a lap time given in whole milliseconds.
+    """
+    total_seconds, milliseconds = divmod(milliseconds, 1000)
+    total_seconds %= 24 * 60 * 60
+    return f"{total_seconds // 60:01d}:{total_seconds % 60:02d}.{milliseconds:03d}"
 
 # Create a Blueprint for utility routes
 utils_bp = Blueprint('utils', __name__)
 
+# Configure error handling
+configure_error_handling(utils_bp)
+
 @utils_bp.route('/driver-color/<driver_code>', methods=['GET'])
+@cache.cached(timeout=3600, query_string=True, response_filter=cache_success_only)
+@route_errors("getting color for driver {driver_code}")
 def driver_color(driver_code):
     """
     Get the color for a specific driver.
@@ -36,21 +50,19 @@ def driver_color(driver_code):
     Returns:
         JSON response with the driver's color
     """
-    try:
-        year = request.args.get('year', None)
-        year = int(year) if year else None
-        
-        color = get_driver_color(driver_code, year)
-        
-        return create_response({
-            'color': color,
-            'driver': driver_code,
-            'year': year
-        })
-    except Exception as e:
-        return create_response(None, success=False, error=str(e))
+    year = parse_year(request.args.get('year'))
+    
+    color = get_driver_color(driver_code, year)
+    
+    return create_response({
+        'color': color,
+        'driver': driver_code,
+        'year': year
+    })
 
 @utils_bp.route('/team-color', methods=['GET'])
+@cache.cached(timeout=3600, query_string=True, response_filter=cache_success_only)
+@route_errors("getting team color")
 def team_color():
     """
     Get the color for a specific team.
@@ -62,25 +74,23 @@ def team_color():
     Returns:
         JSON response with the team's color
     """
-    try:
-        team = request.args.get('team', None)
-        if not team:
-            return create_response(None, success=False, error="Team parameter is required")
-            
-        year = request.args.get('year', None)
-        year = int(year) if year else None
-        
-        color = get_team_color(team, year)
+    team = request.args.get('team', None)
+    if not team:
+        return error_response("Team parameter is required", 400)
         
-        return create_response({
-            'color': color,
-            'team': team,
-            'year': year
-        })
-    except Exception as e:
-        return create_response(None, success=False, error=str(e))
+    year = parse_year(request.args.get('year'))
+    
+    color = get_team_color(team, year)
+    
+    return create_response({
+        'color': color,
+        'team': team,
+        'year': year
+    })
 
 @utils_bp.route('/all-driver-colors', methods=['GET'])
+@cache.cached(timeout=3600, query_string=True, response_filter=cache_success_only)
+@route_errors("getting all driver colors")
 def all_driver_colors():
     """
     Get colors for all drivers.
@@ -91,26 +101,18 @@ def all_driver_colors():
     Returns:
         JSON response with all driver colors
     """
-    try:
-        year = request.args.get('year', None)
-        year = int(year) if year else None
-        
-        # Get the color mapping
-        color_mapping = get_color_mapping(year)
-        
-        # Extract driver colors
-        driver_colors = {}
-        for driver_code, color in color_mapping.get('drivers', {}).items():
-            driver_colors[driver_code] = color
-        
-        return create_response({
-            'colors': driver_colors,
-            'year': year
-        })
-    except Exception as e:
-        return create_response(None, success=False, error=str(e))
+    year = parse_year(request.args.get('year'))
+    
+    colors = get_color_mapping(year).get('drivers', {})
+    
+    return create_response({
+        'colors': colors,
+        'year': year
+    })
 
 @utils_bp.route('/all-team-colors', methods=['GET'])
+@cache.cached(timeout=3600, query_string=True, response_filter=cache_success_only)
+@route_errors("getting all team colors")
 def all_team_colors():
     """
     Get colors for all teams.
@@ -121,21 +123,11 @@ def all_team_colors():
     Returns:
         JSON response with all team colors
     """
-    try:
-        year = request.args.get('year', None)
-        year = int(year) if year else None
-        
-        # Get the color mapping
-        color_mapping = get_color_mapping(year)
-        
-        # Extract team colors
-        team_colors = {}
-        for team_name, color in color_mapping.get('teams', {}).items():
-            team_colors[team_name] = color
-        
-        return create_response({
-            'colors': team_colors,
-            'year': year
-        })
-    except Exception as e:
-        return create_response(None, success=False, error=str(e))
+    year = parse_year(request.args.get('year'))
+    
+    colors = get_color_mapping(year).get('teams', {})
+    
+    return create_response({
+        'colors': colors,
+        'year': year
+    })
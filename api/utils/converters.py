@@ -0,0 +1,27 @@
+"""
+URL converters for F1 Web App API routes.
+"""
+
+from werkzeug.routing import BaseConverter
+from api.utils.validation import DRIVER_RE, SESSION_RE
+
+
+class RaceConverter(BaseConverter):
+    """
+    Match a race name or round number (e.g. 'Bahrain_Grand_Prix', 'São Paulo Grand Prix', '5').
+    """
+    regex = r"[\w .'-]{1,64}"
+
+
+class DriverConverter(BaseConverter):
+    """
+    Match a three-letter driver code (e.g. 'VER').
+    """
+    regex = DRIVER_RE.pattern
+
+
+class SessionConverter(BaseConverter):
+    """
+    Match a session type code (e.g. 'R', 'Q', 'FP1').
+    """
+    regex = f'(?:{SESSION_RE.pattern})'
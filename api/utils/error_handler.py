@@ -2,12 +2,41 @@
 Error handling utilities for F1 Web App API.
 """
 
+import functools
+import inspect
 import logging
-from flask import Blueprint, jsonify, request
+import orjson
+from flask import Blueprint, Response, request
 from werkzeug.exceptions import HTTPException
+from api.utils.response import error_response
 
 logger = logging.getLogger('f1webapp')
 
+# Error bodies share a fixed prefix, so only the message needs encoding per error
+_ERROR_BODY_PREFIX = b'{"success":false,"message":'
+
+# The generic 500 body never changes, so encode it once
+_UNEXPECTED_ERROR_BODY = _ERROR_BODY_PREFIX + orjson.dumps('An unexpected error occurred') + b'}'
+
+
+def _error_json(message, status_code, errors=None):
+    """
+    Build a standardized error response without constructing a dict.
+    
+    Args:
+        message: Error message
+        status_code: HTTP status code
+        errors: Optional dictionary of specific errors
+        
+    Returns:
+        Response: Flask response object
+    """
+    body = _ERROR_BODY_PREFIX + orjson.dumps(message)
+    if errors:
+        body += b',"errors":' + orjson.dumps(errors, option=orjson.OPT_NON_STR_KEYS)
+    
+    return Response(body + b'}', status=status_code, mimetype='application/json')
+
 
 class APIError(Exception):
     """Base class for API errors."""
@@ -37,39 +66,20 @@ def register_error_handlers(app):
     @app.errorhandler(APIError)
     def handle_api_error(error):
         """Handle custom API errors."""
-        response = {
-            'success': False,
-            'message': error.message
-        }
-        
-        if error.errors:
-            response['errors'] = error.errors
-            
-        return jsonify(response), error.status_code
+        return _error_json(error.message, error.status_code, error.errors)
     
     @app.errorhandler(HTTPException)
     def handle_http_error(error):
         """Handle HTTP exceptions."""
-        response = {
-            'success': False,
-            'message': error.description
-        }
-        
-        return jsonify(response), error.code
+        return _error_json(error.description, error.code)
     
     @app.errorhandler(Exception)
     def handle_generic_error(error):
         """Handle generic exceptions."""
-        # Log the error
-        logger.error(f"Unhandled exception: {str(error)}")
-        logger.exception(error)
+        # Log the error with its traceback
+        logger.error("Unhandled exception: %s", error, exc_info=True)
         
-        response = {
-            'success': False,
-            'message': 'An unexpected error occurred'
-        }
-        
-        return jsonify(response), 500
+        return Response(_UNEXPECTED_ERROR_BODY, status=500, mimetype='application/json')
 
 
 def configure_error_handling(blueprint):
@@ -82,12 +92,48 @@ def configure_error_handling(blueprint):
     @blueprint.errorhandler(APIError)
     def handle_api_error(error):
         """Handle custom API errors."""
-        response = {
-            'success': False,
-            'message': error.message
-        }
+        return _error_json(error.message, error.status_code, error.errors)
+
+
+def route_errors(what):
+    """
+    Decorate a view so any exception is logged once and returned as a 500 error response.
+    
+    APIErrors and HTTP exceptions are re-raised for their error handlers.
+    The exception text is only logged, never sent to the client.
+    
+    Args:
+        what: Description of the operation, formatted with the view's URL
+            arguments (e.g. 'getting events for year {year}')
         
-        if error.errors:
-            response['errors'] = error.errors
-            
-        return jsonify(response), error.status_code
+    Returns:
+        function: The decorator
+    """
+    def handle(error, kwargs):
+        description = what.format(**kwargs)
+        logger.error("Error %s: %s", description, error, exc_info=True)
+        return error_response(f"Error {description}", 500)
+    
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def wrapper(*args, **kwargs):
+                try:
+                    return await view(*args, **kwargs)
+                except (APIError, HTTPException):
+                    raise
+                except Exception as e:
+                    return handle(e, kwargs)
+        else:
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                try:
+                    return view(*args, **kwargs)
+                except (APIError, HTTPException):
+                    raise
+                except Exception as e:
+                    return handle(e, kwargs)
+        
+        return wrapper
+    
+    return decorator
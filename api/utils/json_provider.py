@@ -0,0 +1,130 @@
+"""
+JSON provider for F1 Web App API.
+
+Serializes responses with orjson instead of the standard library encoder.
+"""
+
+import dataclasses
+import decimal
+import uuid
+from datetime import date
+
+import orjson
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+
+def _default(o):
+    """
+    Serialize the types orjson hands back, matching Flask's default provider.
+
+    Dates and datetimes are passed through by orjson so they keep Flask's
+    HTTP-date format rather than orjson's ISO-8601.
+
+    Args:
+        o: The object orjson could not serialize
+
+    Returns:
+        A JSON-serializable value
+
+    Raises:
+        TypeError: If the object type is not supported
+    """
+    if isinstance(o, date):
+        return http_date(o)
+
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    NumPy arrays and scalars are serialized natively, so service code does
+    not need to convert them with ``.tolist()`` before returning.
+    """
+
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    
+    # Same meaning as on Flask's DefaultJSONProvider
+    sort_keys = True
+    compact = None
+
+    def dumps(self, obj, *, option=None, **kwargs):
+        """
+        Serialize data as JSON.
+
+        Args:
+            obj: The data to serialize
+            option: Optional orjson option flags (defaults to ``self.option``)
+
+        Returns:
+            str: The JSON string
+        """
+        return self.dumps_bytes(obj, option=option).decode('utf-8')
+
+    def dumps_bytes(self, obj, *, option=None):
+        """
+        Serialize data as JSON bytes, skipping the decode step.
+
+        Args:
+            obj: The data to serialize
+            option: Optional orjson option flags (defaults to ``self.option``)
+
+        Returns:
+            bytes: The encoded JSON
+        """
+        return orjson.dumps(obj, default=_default, option=self._resolve_option(option))
+
+    def _resolve_option(self, option):
+        """
+        Combine the base option flags with the sort_keys/compact settings.
+
+        Args:
+            option: Explicit orjson option flags, or None to use ``self.option``
+
+        Returns:
+            int: The orjson option flags to encode with
+        """
+        if option is None:
+            option = self.option
+        
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+            
+        return option
+
+    def loads(self, s, **kwargs):
+        """
+        Deserialize data as JSON.
+
+        Args:
+            s: Text or UTF-8 bytes
+
+        Returns:
+            The decoded data
+        """
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize the given arguments as JSON and return a response with the
+        ``application/json`` mimetype.
+
+        Returns:
+            Response: Flask response object
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype='application/json')
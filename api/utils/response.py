@@ -2,7 +2,30 @@
 Response utilities for F1 Web App API.
 """
 
-from flask import jsonify
+import hashlib
+import os
+from datetime import datetime
+from flask import Response, current_app, request
+
+# Seconds browsers and CDNs may reuse a response; past seasons never change
+HISTORICAL_MAX_AGE = 365 * 24 * 60 * 60
+CURRENT_MAX_AGE = 60
+
+# FastF1's HTTP cache, rewritten whenever new data is downloaded
+FASTF1_HTTP_CACHE_FILE = 'fastf1_http_cache.sqlite'
+
+
+def _json_response(obj):
+    """
+    Encode data straight to a JSON response with the app's orjson provider.
+    
+    Args:
+        obj: The data to serialize
+        
+    Returns:
+        Response: Flask response object
+    """
+    return Response(current_app.json.dumps_bytes(obj), mimetype='application/json')
 
 
 def create_response(data=None, status_code=200, error=None):
@@ -27,7 +50,7 @@ def create_response(data=None, status_code=200, error=None):
         if data is not None:
             response['data'] = data
     
-    return jsonify(response), status_code
+    return _json_response(response), status_code
 
 
 def success_response(data=None, message=None, status_code=200):
@@ -52,7 +75,68 @@ def success_response(data=None, message=None, status_code=200):
     if message is not None:
         response['message'] = message
         
-    return jsonify(response), status_code
+    return _json_response(response), status_code
+
+
+def stream_success_response(data, stream_key, batch_size=500, status_code=200):
+    """
+    Create a standardized success response that streams one large list.
+    
+    The body matches success_response(data), but the list under
+    data[stream_key] is encoded and sent in batches instead of building
+    the whole JSON document in memory first.
+    
+    Args:
+        data: The data to include in the response
+        stream_key: Key of the list in data to stream
+        batch_size: Number of list items in each chunk (default: 500)
+        status_code: HTTP status code (default: 200)
+        
+    Returns:
+        tuple: (response, status_code)
+    """
+    dumps = current_app.json.dumps_bytes
+    items = data[stream_key]
+    head = {key: value for key, value in data.items() if key != stream_key}
+    
+    def generate():
+        yield b''.join(
+            [b'{"success":true,"data":{']
+            + [dumps(key) + b':' + dumps(value) + b',' for key, value in head.items()]
+            + [dumps(stream_key) + b':[']
+        )
+        for start in range(0, len(items), batch_size):
+            chunk = b','.join(dumps(item) for item in items[start:start + batch_size])
+            yield (b',' if start else b'') + chunk
+        yield b']}}'
+    
+    return Response(generate(), mimetype='application/json'), status_code
+
+
+def ndjson_response(items, first_batch=50, batch_size=500, status_code=200):
+    """
+    Create a response that streams items as newline-delimited JSON.
+    
+    A small first batch is sent on its own so clients can start rendering
+    straight away; the rest follows in larger chunks.
+    
+    Args:
+        items: The items to stream, one JSON document per line
+        first_batch: Number of items in the first chunk (default: 50)
+        batch_size: Number of items in each later chunk (default: 500)
+        status_code: HTTP status code (default: 200)
+        
+    Returns:
+        tuple: (response, status_code)
+    """
+    dumps = current_app.json.dumps_bytes
+    
+    def generate():
+        yield b''.join(dumps(item) + b'\n' for item in items[:first_batch])
+        for start in range(first_batch, len(items), batch_size):
+            yield b''.join(dumps(item) + b'\n' for item in items[start:start + batch_size])
+    
+    return Response(generate(), mimetype='application/x-ndjson'), status_code
 
 
 def error_response(message, status_code=400, errors=None):
@@ -75,4 +159,80 @@ def error_response(message, status_code=400, errors=None):
     if errors is not None:
         response['errors'] = errors
         
-    return jsonify(response), status_code
+    return _json_response(response), status_code
+
+
+def max_age_for_year(year):
+    """
+    Get the Cache-Control max-age for data from a given season.
+    
+    Args:
+        year: The season the response is for, or None if it isn't season-specific
+        
+    Returns:
+        int: max-age in seconds
+    """
+    if year is not None and year < datetime.now().year:
+        return HISTORICAL_MAX_AGE
+    return CURRENT_MAX_AGE
+
+
+def add_cache_headers(response, max_age):
+    """
+    Mark a response as publicly cacheable for max_age seconds.
+    
+    Args:
+        response: Flask response object
+        max_age: Cache-Control max-age in seconds
+        
+    Returns:
+        Response: The same response
+    """
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    
+    # Compressed and uncompressed variants must be cached separately
+    response.vary.add('Accept-Encoding')
+    
+    return response
+
+
+def make_conditional(response, max_age=None):
+    """
+    Tag a response with an ETag and answer with 304 Not Modified when the
+    client's If-None-Match already matches it.
+    
+    Args:
+        response: Flask response object
+        max_age: Optional public Cache-Control max-age in seconds
+        
+    Returns:
+        Response: The (possibly 304) response
+    """
+    response.add_etag()
+    
+    if max_age is not None:
+        add_cache_headers(response, max_age)
+        
+    return response.make_conditional(request)
+
+
+def data_etag(key, version=1):
+    """
+    Get an ETag for a response built from FastF1 data, without building it.
+    
+    The tag combines the request key with the modification time of FastF1's
+    HTTP cache file, so it changes whenever new data has been downloaded.
+    
+    Args:
+        key: What the response is for (e.g. the request path and query string)
+        version: Response format version; bump it when the payload format changes
+        
+    Returns:
+        str: The ETag value
+    """
+    try:
+        mtime = os.stat(os.path.join(current_app.config['CACHE_DIR'], FASTF1_HTTP_CACHE_FILE)).st_mtime_ns
+    except OSError:
+        mtime = 0
+    return hashlib.sha1(f"{version}:{mtime}:{key}".encode()).hexdigest()
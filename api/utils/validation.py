@@ -0,0 +1,79 @@
+"""
+Request validation utilities for F1 Web App API.
+"""
+
+import logging
+import re
+from api.utils.error_handler import APIError
+
+logger = logging.getLogger('f1webapp')
+
+# Most drivers a single comparison request may ask for
+MAX_DRIVERS = 6
+
+# Three-letter driver abbreviation (e.g. 'VER')
+DRIVER_RE = re.compile(r'[A-Z]{3}')
+
+# Session type codes accepted by FastF1
+SESSION_RE = re.compile(r'R|Q|S|SQ|SS|FP[1-3]')
+
+
+def parse_driver_list(drivers, limit=MAX_DRIVERS):
+    """
+    Parse a comma-separated driver query parameter.
+    
+    Invalid codes are dropped, duplicates are removed keeping the first
+    occurrence, and the list is capped so one request cannot ask for an
+    unbounded number of telemetry extractions.
+    
+    Args:
+        drivers: Comma-separated driver codes (e.g. 'VER,HAM')
+        limit: Maximum number of drivers to keep
+        
+    Returns:
+        list: Valid, unique driver codes
+    """
+    driver_list = list(dict.fromkeys(filter(DRIVER_RE.fullmatch, drivers.split(','))))
+    
+    if len(driver_list) > limit:
+        logger.warning("Driver list capped at %s of %s drivers", limit, len(driver_list))
+        driver_list = driver_list[:limit]
+    
+    return driver_list
+
+
+def is_value_list(value):
+    """
+    Check that a JSON value is a non-empty list of integers or strings.
+    
+    Args:
+        value: The decoded JSON value
+        
+    Returns:
+        bool: True if the value is a usable list
+    """
+    return (
+        isinstance(value, list) and bool(value)
+        and all(isinstance(item, (int, str)) and not isinstance(item, bool) for item in value)
+    )
+
+
+def parse_year(year):
+    """
+    Parse an optional year query parameter.
+    
+    Args:
+        year: The raw parameter value, or None if not given
+        
+    Returns:
+        int: The year, or None if not given
+        
+    Raises:
+        APIError: If the year is not an integer
+    """
+    if not year:
+        return None
+    try:
+        return int(year)
+    except ValueError:
+        raise APIError(f"Invalid year: {year}", 400)
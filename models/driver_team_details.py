@@ -2,29 +2,29 @@
 Driver and team details model for F1 Web App.
 """
 
+from dataclasses import dataclass
+from typing import Optional
 
+
+@dataclass(slots=True)
 class DriverTeamDetails:
     """
     Class to store driver or team details.
+    
+    Attributes:
+        name: Driver name or team name
+        team: Team name (same as name for constructor standings)
+        points: Championship points
+        position: Championship position (optional)
+        driver_number: Driver number (optional, for drivers only)
+        driver_code: Driver code (optional, for drivers only)
     """
-    def __init__(self, name, team, points, position=None, driver_number=None, driver_code=None):
-        """
-        Initialize driver or team details.
-        
-        Args:
-            name: Driver name or team name
-            team: Team name (same as name for constructor standings)
-            points: Championship points
-            position: Championship position (optional)
-            driver_number: Driver number (optional, for drivers only)
-            driver_code: Driver code (optional, for drivers only)
-        """
-        self.name = name
-        self.team = team
-        self.points = points
-        self.position = position
-        self.driver_number = driver_number
-        self.driver_code = driver_code
+    name: str
+    team: str
+    points: float
+    position: Optional[int] = None
+    driver_number: Optional[int] = None
+    driver_code: Optional[str] = None
         
     def to_dict(self):
         """
@@ -33,6 +33,17 @@ class DriverTeamDetails:
         Returns:
             dict: Dictionary representation of the driver or team
         """
+        # Driver standings populate every field, so build those in one literal
+        if self.position is not None and self.driver_number is not None and self.driver_code is not None:
+            return {
+                "name": self.name,
+                "team": self.team,
+                "points": self.points,
+                "position": self.position,
+                "driver_number": self.driver_number,
+                "driver_code": self.driver_code
+            }
+        
         result = {
             "name": self.name,
             "team": self.team,
@@ -2,29 +2,28 @@
 F1 event model for F1 Web App.
 """
 
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Any
 
 
+@dataclass(slots=True)
 class F1Event:
     """
     Class to store F1 event details.
+    
+    Attributes:
+        race_name: Name of the race
+        event_type: Type of event (e.g., 'Race', 'Practice 1', 'Qualifying')
+        start_time: Start time of the event
+        location: Location of the event
+        country: Country of the event
     """
-    def __init__(self, race_name, event_type, start_time, location, country):
-        """
-        Initialize F1 event details.
-        
-        Args:
-            race_name: Name of the race
-            event_type: Type of event (e.g., 'Race', 'Practice 1', 'Qualifying')
-            start_time: Start time of the event
-            location: Location of the event
-            country: Country of the event
-        """
-        self.race_name = race_name
-        self.event_type = event_type
-        self.start_time = start_time
-        self.location = location
-        self.country = country
+    race_name: str
+    event_type: str
+    start_time: Any
+    location: str
+    country: str
         
     def to_dict(self):
         """
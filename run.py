@@ -2,10 +2,7 @@
 Entry point for the F1 Web App.
 """
 
-import os
 import argparse
-import fastf1
-from flask import Flask
 from api.app import create_app
 from api.config import get_config
 
@@ -17,12 +14,7 @@ args = parser.parse_args()
 # Get configuration
 config = get_config()
 
-# Enable FastF1 cache
-if not os.path.exists(config.CACHE_DIR):
-    os.makedirs(config.CACHE_DIR)
-fastf1.Cache.enable_cache(config.CACHE_DIR)
-
-# Create Flask app
+# Create Flask app (this also enables the FastF1 cache)
 app = create_app()
 
 if __name__ == '__main__':
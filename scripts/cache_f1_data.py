@@ -9,6 +9,7 @@ performance for the web application.
 
 The script includes performance optimizations such as:
 - Session prioritization (races and qualifying first)
+- Events cached in parallel worker processes
 - Memory management for large operations
 - Usage statistics tracking
 
@@ -22,10 +23,11 @@ import argparse
 import logging
 import time
 import gc
-import json
+import orjson
+import threading
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import fastf1
+from functools import lru_cache
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError, as_completed
 
 # Try to import tqdm, but make it optional
 try:
@@ -35,11 +37,15 @@ except ImportError:
     TQDM_AVAILABLE = False
     # Define a simple progress bar alternative
     class SimplePBar:
+        # Minimum seconds between redraws, as tqdm's default mininterval
+        mininterval = 0.1
+        
         def __init__(self, total, desc=""):
             self.total = total
             self.desc = desc
             self.n = 0
             self.start_time = time.time()
+            self._last_print = 0.0
             self._print_status()
             
         def update(self, n=1):
@@ -51,7 +57,13 @@ except ImportError:
             self._print_status()
             
         def _print_status(self):
-            elapsed = time.time() - self.start_time
+            # Throttle redraws, but always draw the final state
+            now = time.time()
+            if now - self._last_print < self.mininterval and self.n < self.total:
+                return
+            self._last_print = now
+            
+            elapsed = now - self.start_time
             percent = 100 * (self.n / self.total) if self.total > 0 else 0
             postfix_str = ""
             if hasattr(self, 'postfix'):
@@ -71,7 +83,7 @@ except ImportError:
 
 # Add parent directory to path to import services
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services.session_service import SessionService
+from services.session_service import SessionService, enable_cache, reset_http_sessions
 
 # Configure logging
 logging.basicConfig(
@@ -95,6 +107,10 @@ SESSION_PRIORITY = {
     'FP1': 4   # Free Practice 1 (lowest priority)
 }
 
+# Session types from highest to lowest priority
+PRIORITY_ORDER = sorted(SESSION_PRIORITY, key=SESSION_PRIORITY.get, reverse=True)
+_PRIORITY_SET = frozenset(PRIORITY_ORDER)
+
 # Usage statistics
 usage_stats = {
     'start_time': None,
@@ -108,6 +124,12 @@ usage_stats = {
     'session_types': {}
 }
 
+# Worker memory (MB) above which update_memory_stats() triggers garbage collection
+MEMORY_GC_THRESHOLD_MB = 4000
+
+# SessionService used by cache_event, set up in each worker by init_worker()
+_session_service = None
+
 def parse_args():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description='Cache F1 data from 2018 to present')
@@ -116,7 +138,7 @@ def parse_args():
     parser.add_argument('--start-year', type=int, default=2018,
                         help='First year to cache (default: 2018)')
     parser.add_argument('--threads', type=int, default=4,
-                        help='Number of threads to use for parallel downloading (default: 4)')
+                        help='Number of worker processes to use for parallel downloading (default: 4)')
     parser.add_argument('--retry', type=int, default=3,
                         help='Number of retry attempts for failed downloads (default: 3)')
     parser.add_argument('--timeout', type=int, default=300,
@@ -160,21 +182,29 @@ def get_events_for_year(year, session_service):
             
         return event_list
     except Exception as e:
-        logger.error(f"Error fetching events for {year}: {e}")
+        logger.error("Error fetching events for %s: %s", year, e)
         return None
 
-def get_available_sessions_for_event(year, event_name, session_service):
+@lru_cache(maxsize=2048)
+def _session_codes_for_event(year, event_name):
+    """
+    Get the session codes for an event from the worker's SessionService.
+    
+    Memoized per process, so retries don't repeat the schedule lookup;
+    failures raise and are therefore not cached.
+    """
+    return tuple(session['code'] for session in _session_service.get_session_types(year, event_name))
+
+def get_available_sessions_for_event(year, event_name):
     """
     Get all available sessions for a specific event.
     This properly handles sprint weekends which have a different format.
     """
     try:
         # Get session types from SessionService
-        sessions = session_service.get_session_types(year, event_name)
-        available_sessions = [session['code'] for session in sessions]
-        return available_sessions
+        return list(_session_codes_for_event(year, event_name))
     except Exception as e:
-        logger.error(f"Error getting available sessions for {year} {event_name}: {e}")
+        logger.error("Error getting available sessions for %s %s: %s", year, event_name, e)
         return []
 
 def prioritize_sessions(sessions):
@@ -187,9 +217,55 @@ def prioritize_sessions(sessions):
     Returns:
         list: Prioritized list of session types
     """
-    return sorted(sessions, key=lambda x: SESSION_PRIORITY.get(x, 0), reverse=True)
+    # Walk the fixed priority order instead of sorting; unknown types keep their order at the end
+    available = set(sessions)
+    return [s for s in PRIORITY_ORDER if s in available] + [s for s in sessions if s not in _PRIORITY_SET]
+
+def new_stats():
+    """Create an empty set of session counters for one event."""
+    return {
+        'total_sessions': 0,
+        'successful_sessions': 0,
+        'failed_sessions': 0,
+        'memory_usage': 0,
+        'session_types': {}
+    }
 
-def update_memory_stats():
+def merge_stats(stats):
+    """
+    Merge the session counters returned by a worker into the usage statistics.
+    
+    Args:
+        stats: Counters for one event, as created by new_stats()
+    """
+    for key in ('total_sessions', 'successful_sessions', 'failed_sessions'):
+        usage_stats[key] += stats[key]
+    
+    usage_stats['memory_usage'] = max(usage_stats['memory_usage'], stats['memory_usage'])
+    
+    for session_type, counts in stats['session_types'].items():
+        totals = usage_stats['session_types'].setdefault(session_type, {'total': 0, 'successful': 0, 'failed': 0})
+        for key, value in counts.items():
+            totals[key] += value
+
+def init_worker(cache_dir, max_cache_size):
+    """
+    Set up the FastF1 cache and SessionService in a worker process.
+    
+    The cache is enabled through the session service so every FastF1 download
+    in the worker goes through its shared keep-alive connection pool.
+    
+    Args:
+        cache_dir: Directory for the FastF1 cache
+        max_cache_size: Maximum number of sessions to keep in memory
+    """
+    global _session_service
+    
+    enable_cache(cache_dir)
+    SessionService.max_cache_size = max_cache_size
+    _session_service = SessionService
+
+def update_memory_stats(stats):
     """Update memory usage statistics."""
     try:
         # Get memory usage
@@ -203,98 +279,142 @@ def update_memory_stats():
             logger.warning("psutil not installed, memory tracking disabled")
         
         # Update memory usage in stats
-        usage_stats['memory_usage'] = memory_usage
+        stats['memory_usage'] = max(stats['memory_usage'], memory_usage)
         
-        # If memory usage is high, trigger garbage collection
-        if memory_usage > 1000:  # More than 1GB
-            gc.collect()
+        # If memory usage is high, trigger a young-generation collection; a full
+        # collection would rescan every long-lived object on each session
+        if memory_usage > MEMORY_GC_THRESHOLD_MB:
+            gc.collect(generation=1)
             
         return memory_usage
     except Exception as e:
-        logger.error(f"Error updating memory stats: {e}")
+        logger.error("Error updating memory stats: %s", e)
         return 0
 
-def cache_session(year, event_name, session_type, session_service, retry_count=3, timeout=300):
+def call_with_timeout(func, *args, timeout=None):
+    """
+    Call a function on a daemon thread and wait at most timeout seconds for it.
+    
+    A load that hangs on a dead connection cannot be interrupted, but the
+    caller is released and the daemon thread cannot hold up process exit.
+    Callers should reset the HTTP sessions on timeout so the abandoned
+    thread's connection is closed rather than left open.
+    
+    Args:
+        func: The function to call
+        *args: Positional arguments for the function
+        timeout: Seconds to wait for the result (default: no limit)
+        
+    Returns:
+        The function's return value
+        
+    Raises:
+        concurrent.futures.TimeoutError: If the call does not finish in time
+    """
+    future = Future()
+    
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=run, name='session-load', daemon=True).start()
+    return future.result(timeout=timeout)
+
+def cache_session(year, event_name, session_type, session_service, stats, retry_count=3, timeout=300):
     """Cache a specific session using SessionService."""
     # Update session type stats
-    if session_type not in usage_stats['session_types']:
-        usage_stats['session_types'][session_type] = {
+    if session_type not in stats['session_types']:
+        stats['session_types'][session_type] = {
             'total': 0,
             'successful': 0,
             'failed': 0
         }
     
-    usage_stats['session_types'][session_type]['total'] += 1
-    usage_stats['total_sessions'] += 1
+    stats['session_types'][session_type]['total'] += 1
+    stats['total_sessions'] += 1
     
     for attempt in range(retry_count):
         try:
-            # Set a timeout for the session load
-            start_time = time.time()
-            
-            # Try to load the session using SessionService
-            session_service.get_session(year, event_name, session_type)
+            # Try to load the session using SessionService, giving up after the timeout;
+            # a retry of the same session joins a load that is still in flight
+            call_with_timeout(session_service.get_session, year, event_name, session_type, timeout=timeout)
             
             # If we get here, the session was loaded successfully
-            logger.info(f"Successfully cached {year} {event_name} {session_type}")
+            logger.info("Successfully cached %s %s %s", year, event_name, session_type)
             
             # Update stats
-            usage_stats['session_types'][session_type]['successful'] += 1
-            usage_stats['successful_sessions'] += 1
+            stats['session_types'][session_type]['successful'] += 1
+            stats['successful_sessions'] += 1
             
             # Update memory stats
-            update_memory_stats()
+            update_memory_stats(stats)
             
             return True
         except Exception as e:
-            elapsed = time.time() - start_time
-            if elapsed >= timeout:
-                logger.warning(f"Timeout ({timeout}s) reached for {year} {event_name} {session_type}")
+            if isinstance(e, TimeoutError):
+                logger.warning("Timeout (%ss) reached for %s %s %s", timeout, year, event_name, session_type)
+                # Close the connection the abandoned load is blocked on so its
+                # thread fails and releases the session
+                reset_http_sessions()
+                reason = f"timed out after {timeout}s"
+            else:
+                reason = e
             
             if attempt < retry_count - 1:
-                logger.warning(f"Attempt {attempt+1}/{retry_count} failed for {year} {event_name} {session_type}: {e}")
+                logger.warning("Attempt %s/%s failed for %s %s %s: %s", attempt+1, retry_count, year, event_name, session_type, reason)
                 time.sleep(2)  # Wait before retrying
             else:
-                logger.error(f"Failed to cache {year} {event_name} {session_type} after {retry_count} attempts: {e}")
+                logger.error("Failed to cache %s %s %s after %s attempts: %s", year, event_name, session_type, retry_count, reason)
                 
                 # Update stats
-                usage_stats['session_types'][session_type]['failed'] += 1
-                usage_stats['failed_sessions'] += 1
+                stats['session_types'][session_type]['failed'] += 1
+                stats['failed_sessions'] += 1
                 
                 return False
 
-def cache_event(year, event, session_service, prioritize=False, retry_count=3, timeout=300):
-    """Cache all available sessions for a specific event."""
+def cache_event(year, event, prioritize=False, retry_count=3, timeout=300):
+    """
+    Cache all available sessions for a specific event.
+    
+    Runs in a worker process, so session counters are returned to the parent
+    for merging rather than written to the worker's copy of usage_stats.
+    """
+    session_service = _session_service
+    stats = new_stats()
     event_name = event['EventName']
-    logger.info(f"Caching event: {year} {event_name}")
+    logger.info("Caching event: %s %s", year, event_name)
     
     # Get available sessions for this event
-    available_sessions = get_available_sessions_for_event(year, event_name, session_service)
-    logger.info(f"Available sessions for {year} {event_name}: {available_sessions}")
+    available_sessions = get_available_sessions_for_event(year, event_name)
+    logger.info("Available sessions for %s %s: %s", year, event_name, available_sessions)
     
     # Prioritize sessions if requested
     if prioritize and available_sessions:
         available_sessions = prioritize_sessions(available_sessions)
-        logger.info(f"Prioritized sessions for {year} {event_name}: {available_sessions}")
+        logger.info("Prioritized sessions for %s %s: %s", year, event_name, available_sessions)
     
     results = {}
     for session_type in available_sessions:
-        result = cache_session(year, event_name, session_type, session_service, retry_count, timeout)
+        result = cache_session(year, event_name, session_type, session_service, stats, retry_count, timeout)
         results[session_type] = result
-        
-        # Periodically trigger garbage collection to free memory
-        gc.collect()
     
-    return results, len(available_sessions)
+    return results, len(available_sessions), stats
 
 def save_stats(stats_file):
     """Save usage statistics to a JSON file."""
     try:
-        with open(stats_file, 'w') as f:
-            json.dump(usage_stats, f, indent=2)
-        logger.info(f"Statistics saved to {stats_file}")
+        # Write to a temporary file and swap it in, so a failed write never leaves a truncated file
+        tmp_file = f"{stats_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(usage_stats, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_file, stats_file)
+        logger.info("Statistics saved to %s", stats_file)
     except Exception as e:
-        logger.error(f"Error saving statistics: {e}")
+        logger.error("Error saving statistics: %s", e)
 
 def main():
     """Main function to cache all F1 data."""
@@ -306,39 +426,42 @@ def main():
     # Create cache directory if it doesn't exist
     os.makedirs(args.cache_dir, exist_ok=True)
     
-    # Enable FastF1 cache
-    fastf1.Cache.enable_cache(args.cache_dir)
-    
-    # Create SessionService with increased cache size
-    session_service = SessionService(max_cache_size=args.max_cache_size)
+    # Enable FastF1 cache for the schedule lookups made here
+    init_worker(args.cache_dir, args.max_cache_size)
+    session_service = _session_service
     
     # Get years to cache
     years = get_years_to_cache(args.start_year)
-    logger.info(f"Caching data for years: {years}")
+    logger.info("Caching data for years: %s", years)
     
-    # Cache data for each year
-    for year in years:
-        logger.info(f"Processing year: {year}")
-        usage_stats['years_processed'].append(year)
-        
-        # Get events for the year
-        events = get_events_for_year(year, session_service)
-        if events is None or len(events) == 0:
-            logger.warning(f"No events found for {year}")
-            continue
-        
-        logger.info(f"Found {len(events)} events for {year}")
-        usage_stats['events_processed'] += len(events)
-        
-        # Create a progress bar for this year
-        with tqdm(total=len(events), desc=f"Year {year}") as pbar:
-            # Use ThreadPoolExecutor for parallel downloading
-            with ThreadPoolExecutor(max_workers=args.threads) as executor:
+    # Session parsing is CPU-bound, so events are cached in separate processes
+    # rather than threads; the pool is shared by every year
+    with ProcessPoolExecutor(
+        max_workers=args.threads,
+        initializer=init_worker,
+        initargs=(args.cache_dir, args.max_cache_size)
+    ) as executor:
+        # Cache data for each year
+        for year in years:
+            logger.info("Processing year: %s", year)
+            usage_stats['years_processed'].append(year)
+            
+            # Get events for the year
+            events = get_events_for_year(year, session_service)
+            if events is None or len(events) == 0:
+                logger.warning("No events found for %s", year)
+                continue
+            
+            logger.info("Found %s events for %s", len(events), year)
+            usage_stats['events_processed'] += len(events)
+            
+            # Create a progress bar for this year
+            with tqdm(total=len(events), desc=f"Year {year}") as pbar:
                 # Submit tasks for each event
                 future_to_event = {}
                 for event in events:
                     future = executor.submit(
-                        cache_event, year, event, session_service, 
+                        cache_event, year, event,
                         args.prioritize, args.retry, args.timeout
                     )
                     future_to_event[future] = event['EventName']
@@ -347,7 +470,8 @@ def main():
                 for future in as_completed(future_to_event):
                     event_name = future_to_event[future]
                     try:
-                        future.result()
+                        _, _, stats = future.result()
+                        merge_stats(stats)
                         
                         # Update progress bar
                         pbar.update(1)
@@ -356,7 +480,7 @@ def main():
                         })
                             
                     except Exception as e:
-                        logger.error(f"Error processing {year} {event_name}: {e}")
+                        logger.error("Error processing %s %s: %s", year, event_name, e)
                         # Update progress bar
                         pbar.update(1)
     
@@ -367,13 +491,13 @@ def main():
     save_stats(args.stats_file)
     
     # Log summary
-    logger.info(f"Caching complete. Successfully cached {usage_stats['successful_sessions']}/{usage_stats['total_sessions']} sessions.")
+    logger.info("Caching complete. Successfully cached %s/%s sessions.", usage_stats['successful_sessions'], usage_stats['total_sessions'])
     if usage_stats['total_sessions'] > 0:
         success_rate = (usage_stats['successful_sessions'] / usage_stats['total_sessions']) * 100
-        logger.info(f"Success rate: {success_rate:.2f}%")
+        logger.info("Success rate: %.2f%%", success_rate)
 
 if __name__ == "__main__":
     start_time = time.time()
     main()
     elapsed = time.time() - start_time
-    logger.info(f"Total execution time: {elapsed:.2f} seconds")
+    logger.info("Total execution time: %.2f seconds", elapsed)
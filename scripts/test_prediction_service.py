@@ -2,7 +2,8 @@
 Test script for the prediction service.
 """
 
-import requests
+import aiohttp
+import asyncio
 import json
 import time
 import argparse
@@ -11,21 +12,23 @@ import os
 BASE_URL = "http://127.0.0.1:5002"
 MODEL_PATH = 'models/trained_models/qualifying_time_predictor.json'
 
-def check_server_status():
+async def check_server_status(session):
     """
     Check if the Flask server is running.
     """
     try:
-        response = requests.get(f"{BASE_URL}/health")
-        if response.status_code == 200:
-            return True
-    except requests.exceptions.ConnectionError:
+        async with session.get(f"{BASE_URL}/health") as response:
+            if response.status == 200:
+                return True
+    except aiohttp.ClientConnectionError:
         return False
     return False
 
-def train_model():
+async def train_model(session):
     """
     Train the model with a default set of races.
+    
+    Returns the training job id, or None if the request failed.
     """
     print("--- Training Model ---")
     train_payload = {
@@ -33,34 +36,125 @@ def train_model():
         "races": ["Bahrain Grand Prix", "Saudi Arabian Grand Prix"]
     }
     try:
-        train_response = requests.post(f"{BASE_URL}/api/predictions/train/qualifying_time_model", json=train_payload)
-        train_response.raise_for_status()
-        print("Training request successful.")
-        print(train_response.json())
-    except requests.exceptions.RequestException as e:
+        async with session.post(f"{BASE_URL}/api/predictions/train/qualifying_time_model", json=train_payload) as train_response:
+            train_response.raise_for_status()
+            print("Training request successful.")
+            train_result = await train_response.json()
+            print(train_result)
+    except aiohttp.ClientError as e:
         print(f"Error during training request: {e}")
-        return False
-    return True
+        return None
+    return train_result.get("job_id")
+
+async def wait_for_training(session, job_id, timeout):
+    """
+    Poll a training job until it finishes, backing off between polls.
+    
+    Returns True if the job completed within the timeout.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{BASE_URL}/api/predictions/train/status/{job_id}") as status_response:
+                status_response.raise_for_status()
+                job = await status_response.json()
+        except aiohttp.ClientError as e:
+            print(f"Error checking training status: {e}")
+            return False
+
+        if job["status"] == "completed":
+            return True
+        if job["status"] == "failed":
+            print(f"Training failed: {job['error']}")
+            return False
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.5, 2.0)
+
+    print(f"Training did not finish within {timeout}s.")
+    return False
 
-def run_prediction(year, race, driver):
+async def run_predictions(session, year, race, drivers):
     """
-    Run a prediction for a given year, race, and driver.
+    Run predictions for several drivers at a given year and race in one batch request.
     """
-    print("\n--- Getting Prediction ---")
-    predict_params = {
-        "year": year,
-        "race": race,
-        "driver": driver
+    batch_payload = {
+        "items": [
+            {"year": year, "race": race, "driver": driver}
+            for driver in drivers
+        ]
     }
     try:
-        print(f"\nRequesting prediction for {driver} at the {year} {race}...")
-        predict_response = requests.get(f"{BASE_URL}/api/predictions/predict/qualifying_time", params=predict_params)
-        predict_response.raise_for_status()
-        print("Prediction request successful.")
-        print(predict_response.json())
-    except requests.exceptions.RequestException as e:
+        print(f"\nRequesting predictions for {', '.join(drivers)} at the {year} {race}...")
+        async with session.post(f"{BASE_URL}/api/predictions/predict/qualifying_time/batch", json=batch_payload) as predict_response:
+            predict_response.raise_for_status()
+            print("Prediction request successful.")
+            for prediction in (await predict_response.json())["predictions"]:
+                print(prediction)
+    except aiohttp.ClientError as e:
         print(f"Error during prediction request: {e}")
 
+async def benchmark_predictions(session, year, race, drivers, concurrency, num_requests):
+    """
+    Fire single-driver prediction requests with up to `concurrency` in flight,
+    and report per-request latency and overall throughput.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    params = [
+        {"year": year, "race": race, "driver": drivers[i % len(drivers)]}
+        for i in range(num_requests)
+    ]
+
+    async def timed_request(predict_params):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with session.get(f"{BASE_URL}/api/predictions/predict/qualifying_time", params=predict_params) as response:
+                    await response.read()
+                    ok = response.status == 200
+            except aiohttp.ClientError:
+                ok = False
+            return time.perf_counter() - start, ok
+
+    print(f"\n--- Benchmark: {num_requests} requests, concurrency {concurrency} ---")
+    start = time.perf_counter()
+    results = await asyncio.gather(*[timed_request(p) for p in params])
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    failed = sum(1 for _, ok in results if not ok)
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"Completed in {elapsed:.2f}s ({num_requests / elapsed:.1f} req/s), {failed} failed")
+    print(f"Latency p50 {p50 * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms")
+
+async def run(args):
+    """
+    Run the test against the server.
+    """
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=32)) as session:
+        if not await check_server_status(session):
+            print("Flask server is not running. Please start the server with the following command:")
+            print("python -m f1webapp.run")
+            return
+
+        if args.force_train or not os.path.exists(MODEL_PATH):
+            job_id = await train_model(session)
+            if job_id is None:
+                return # Stop if training fails
+            print("\nWaiting for model to train...")
+            if not await wait_for_training(session, job_id, args.train_timeout):
+                return
+
+        print("\n--- Getting Predictions ---")
+        drivers = [driver.strip() for driver in args.driver.split(',') if driver.strip()]
+        await run_predictions(session, args.year, args.race, drivers)
+
+        if args.requests > 0:
+            for concurrency in args.concurrency:
+                await benchmark_predictions(session, args.year, args.race, drivers, concurrency, args.requests)
+
 def main():
     """
     Main function to run the test script.
@@ -69,21 +163,14 @@ def main():
     parser.add_argument('--force-train', action='store_true', help="Force retraining of the model.")
     parser.add_argument('--year', type=int, default=2023, help="Year for the prediction.")
     parser.add_argument('--race', type=str, default="Italian Grand Prix", help="Race for the prediction.")
-    parser.add_argument('--driver', type=str, default="VER", help="Driver for the prediction.")
+    parser.add_argument('--train-timeout', type=float, default=600, help="Seconds to wait for training to finish.")
+    parser.add_argument('--driver', type=str, default="VER", help="Driver, or comma-separated drivers, for the prediction.")
+    parser.add_argument('--concurrency', type=int, nargs='*', default=[],
+                        help="Concurrency levels to benchmark single predictions at (e.g. 1 4 16).")
+    parser.add_argument('--requests', type=int, default=32, help="Number of requests per benchmark run.")
     args = parser.parse_args()
 
-    if not check_server_status():
-        print("Flask server is not running. Please start the server with the following command:")
-        print("python -m f1webapp.run")
-        return
-
-    if args.force_train or not os.path.exists(MODEL_PATH):
-        if not train_model():
-            return # Stop if training fails
-        print("\nWaiting for model to train...")
-        time.sleep(5) # Give it a moment to save
-
-    run_prediction(args.year, args.race, args.driver)
+    asyncio.run(run(args))
 
 if __name__ == "__main__":
     main()
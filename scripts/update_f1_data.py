@@ -14,16 +14,23 @@ Usage:
 import os
 import sys
 import argparse
+import asyncio
 import logging
 import time
-import json
+import orjson
 import gc
-from datetime import datetime, timedelta
-import fastf1
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
 
 # Add parent directory to path to import services
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services.session_service import SessionService
+from services.session_service import SessionService, enable_cache
 
 # Configure logging
 logging.basicConfig(
@@ -47,17 +54,69 @@ SESSION_PRIORITY = {
     'FP1': 4   # Free Practice 1 (lowest priority)
 }
 
-# Usage statistics
-usage_stats = {
-    'start_time': None,
-    'end_time': None,
-    'total_sessions': 0,
-    'successful_sessions': 0,
-    'failed_sessions': 0,
-    'events_processed': 0,
-    'memory_usage': 0,
-    'session_types': {}
+# Sort rank of each session type, highest priority first; unknown types rank last
+_PRIORITY_RANK = {
+    session_type: rank
+    for rank, session_type in enumerate(sorted(SESSION_PRIORITY, key=SESSION_PRIORITY.get, reverse=True))
 }
+_UNKNOWN_RANK = len(_PRIORITY_RANK)
+
+# Session outcomes counted in the usage statistics
+OUTCOMES = ('total', 'successful', 'failed')
+
+@dataclass(slots=True)
+class UsageStats:
+    """
+    Usage statistics for an update run.
+    
+    Session outcomes are kept in one flat Counter keyed by outcome and by
+    (session_type, outcome), and only nested for the JSON stats file.
+    """
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    events_processed: int = 0
+    memory_usage: float = 0
+    sessions: Counter = field(default_factory=Counter)
+    
+    def to_dict(self):
+        """
+        Convert to the dictionary written to the stats file.
+        
+        Returns:
+            dict: Usage statistics with per-session-type counts
+        """
+        session_types = sorted({key[0] for key in self.sessions if isinstance(key, tuple)})
+        return {
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'total_sessions': self.sessions['total'],
+            'successful_sessions': self.sessions['successful'],
+            'failed_sessions': self.sessions['failed'],
+            'events_processed': self.events_processed,
+            'memory_usage': self.memory_usage,
+            'session_types': {
+                session_type: {outcome: self.sessions[(session_type, outcome)] for outcome in OUTCOMES}
+                for session_type in session_types
+            }
+        }
+
+# Usage statistics
+usage_stats = UsageStats()
+
+# Guards usage_stats, which sessions of an event update from several threads
+stats_lock = threading.Lock()
+
+def count_session(session_type, outcome):
+    """
+    Count a session outcome in the usage statistics.
+    
+    Args:
+        session_type: The session type (e.g., 'R', 'Q', 'FP1')
+        outcome: 'total', 'successful' or 'failed'
+    """
+    with stats_lock:
+        usage_stats.sessions[outcome] += 1
+        usage_stats.sessions[(session_type, outcome)] += 1
 
 def parse_args():
     """Parse command line arguments."""
@@ -76,8 +135,38 @@ def parse_args():
                         help='Prioritize important sessions (races and qualifying) first')
     parser.add_argument('--retry', type=int, default=3,
                         help='Number of retry attempts for failed downloads (default: 3)')
+    parser.add_argument('--parallel-events', type=int, default=4,
+                        help='Number of events to update at the same time (default: 4)')
     return parser.parse_args()
 
+def filter_events_by_date(events, year, start_date=None, end_date=None):
+    """
+    Select the events whose date falls within a range.
+    
+    Events come in schedule (date) order, so the range bounds are found with
+    a binary search over the parsed dates and the events between them sliced out.
+    
+    Args:
+        events: Events from SessionService.get_events_for_year
+        year: The year of the events
+        start_date: First date to include, as np.datetime64 or date (default: no lower bound)
+        end_date: Last date to include, as np.datetime64 or date (default: no upper bound)
+        
+    Returns:
+        list: Events to update, with year, name and date
+    """
+    # Parse every date at once and drop events without one
+    dated = [event for event in events if event.get('date')]
+    dates = pd.to_datetime([event['date'] for event in dated], format='%Y-%m-%d').to_numpy()
+    
+    lo = np.searchsorted(dates, np.datetime64(start_date), side='left') if start_date is not None else 0
+    hi = np.searchsorted(dates, np.datetime64(end_date), side='right') if end_date is not None else len(dates)
+    
+    return [
+        {'year': year, 'name': event['name'], 'date': date}
+        for event, date in zip(dated[lo:hi], dates[lo:hi].astype('datetime64[D]').tolist())
+    ]
+
 def get_recent_and_upcoming_events(session_service, lookback_days=14, lookahead_days=30):
     """
     Get recent and upcoming F1 events using SessionService.
@@ -91,27 +180,19 @@ def get_recent_and_upcoming_events(session_service, lookback_days=14, lookahead_
         list: List of events to update
     """
     current_year = datetime.now().year
-    events_to_update = []
     
     try:
         # Get current year schedule
         events = session_service.get_events_for_year(current_year)
         
-        # Calculate date range
+        # Calculate date range, kept as datetime64 for the searchsorted filter
         now = datetime.now().date()
-        start_date = now - timedelta(days=lookback_days)
-        end_date = now + timedelta(days=lookahead_days)
+        today = np.datetime64(now, 'D')
+        start_date = today - np.timedelta64(lookback_days, 'D')
+        end_date = today + np.timedelta64(lookahead_days, 'D')
         
         # Filter events within the date range
-        for event in events:
-            if event.get('date'):
-                event_date = datetime.strptime(event['date'], '%Y-%m-%d').date()
-                if start_date <= event_date <= end_date:
-                    events_to_update.append({
-                        'year': current_year,
-                        'name': event['name'],
-                        'date': event_date
-                    })
+        events_to_update = filter_events_by_date(events, current_year, start_date, end_date)
         
         # Check if we need to look at next year's schedule
         if (now.month >= 11):  # If it's November or December
@@ -120,33 +201,29 @@ def get_recent_and_upcoming_events(session_service, lookback_days=14, lookahead_
                 next_year_events = session_service.get_events_for_year(next_year)
                 
                 # Add early events from next year
-                for event in next_year_events:
-                    if event.get('date'):
-                        event_date = datetime.strptime(event['date'], '%Y-%m-%d').date()
-                        if event_date <= end_date:
-                            events_to_update.append({
-                                'year': next_year,
-                                'name': event['name'],
-                                'date': event_date
-                            })
+                events_to_update += filter_events_by_date(next_year_events, next_year, end_date=end_date)
             except Exception as e:
-                logger.warning(f"Could not get next year's schedule: {e}")
+                logger.warning("Could not get next year's schedule: %s", e)
         
         return events_to_update
     except Exception as e:
-        logger.error(f"Error getting events: {e}")
+        logger.error("Error getting events: %s", e)
         return []
 
 def get_available_sessions_for_event(year, event_name, session_service):
-    """Get all available sessions for a specific event using SessionService."""
+    """
+    Get all available sessions for a specific event using SessionService.
+    
+    Returns:
+        dict: Session info (code, name, date) keyed by session code, in schedule order
+    """
     try:
         # Get session types from SessionService
         sessions = session_service.get_session_types(year, event_name)
-        available_sessions = [session['code'] for session in sessions]
-        return available_sessions
+        return {session['code']: session for session in sessions}
     except Exception as e:
-        logger.error(f"Error getting available sessions for {year} {event_name}: {e}")
-        return []
+        logger.error("Error getting available sessions for %s %s: %s", year, event_name, e)
+        return {}
 
 def prioritize_sessions(sessions):
     """
@@ -158,63 +235,73 @@ def prioritize_sessions(sessions):
     Returns:
         list: Prioritized list of session types
     """
-    return sorted(sessions, key=lambda x: SESSION_PRIORITY.get(x, 0), reverse=True)
+    return sorted(sessions, key=lambda x: _PRIORITY_RANK.get(x, _UNKNOWN_RANK))
+
+# Process memory (MB) above which update_memory_stats() triggers garbage collection
+MEMORY_GC_THRESHOLD_MB = 4000
 
-# Try to import psutil, but make it optional
-try:
-    import psutil
-    PSUTIL_AVAILABLE = True
-except ImportError:
-    PSUTIL_AVAILABLE = False
-    logger.warning("psutil not installed, memory tracking will be limited")
+# Current memory is read from /proc on Linux; psutil is only needed elsewhere
+STATM_PATH = '/proc/self/statm'
+if os.path.exists(STATM_PATH):
+    psutil = None
+else:
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+        logger.warning("psutil not installed, memory tracking will be limited")
+
+def get_memory_usage():
+    """
+    Get the process's current resident memory in MB.
+    
+    Returns:
+        float: Resident memory from /proc/self/statm, or from psutil where
+               /proc is unavailable (0 if neither is)
+    """
+    if psutil is None:
+        try:
+            with open(STATM_PATH) as f:
+                resident_pages = int(f.read().split()[1])
+            return resident_pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+        except (OSError, ValueError, IndexError):
+            return 0
+    return psutil.Process().memory_info().rss / 1024 / 1024
 
 def update_memory_stats():
     """Update memory usage statistics."""
     try:
-        # Get memory usage
-        memory_usage = 0
-        if PSUTIL_AVAILABLE:
-            process = psutil.Process(os.getpid())
-            memory_info = process.memory_info()
-            memory_usage = memory_info.rss / 1024 / 1024  # Convert to MB
-            
-            # Update memory usage in stats
-            usage_stats['memory_usage'] = memory_usage
-            
-            # If memory usage is high, trigger garbage collection
-            if memory_usage > 500:  # More than 500MB
-                gc.collect()
-        else:
-            # Without psutil, we can still trigger periodic garbage collection
-            gc.collect()
+        memory_usage = get_memory_usage()
+        
+        # Update memory usage in stats
+        usage_stats.memory_usage = memory_usage
+        
+        # If memory usage is high, trigger a young-generation collection; a full
+        # collection would rescan every long-lived object on each session
+        if memory_usage > MEMORY_GC_THRESHOLD_MB:
+            gc.collect(generation=1)
             
         return memory_usage
     except Exception as e:
-        logger.error(f"Error updating memory stats: {e}")
+        logger.error("Error updating memory stats: %s", e)
         return 0
 
-def update_session(year, event_name, session_type, session_service, retry_count=3):
-    """Update a specific session in the cache using SessionService."""
-    # Update session type stats
-    if session_type not in usage_stats['session_types']:
-        usage_stats['session_types'][session_type] = {
-            'total': 0,
-            'successful': 0,
-            'failed': 0
-        }
+def update_session(year, event_name, session_type, session_service, retry_count=3, session_info=None):
+    """
+    Update a specific session in the cache using SessionService.
     
-    usage_stats['session_types'][session_type]['total'] += 1
-    usage_stats['total_sessions'] += 1
+    session_info is the session's entry from get_available_sessions_for_event,
+    used to skip sessions that have not started yet.
+    """
+    # Update session type stats
+    count_session(session_type, 'total')
     
     try:
-        # Get session info to check if it has started
-        sessions = session_service.get_session_types(year, event_name)
-        session_info = next((s for s in sessions if s['code'] == session_type), None)
-        
+        # Check if the session has started
         if session_info and session_info.get('date'):
-            session_date = datetime.strptime(session_info['date'], '%Y-%m-%d').date()
+            session_date = datetime.fromisoformat(session_info['date']).date()
             if session_date > datetime.now().date():
-                logger.info(f"Session {year} {event_name} {session_type} has not started yet, skipping")
+                logger.info("Session %s %s %s has not started yet, skipping", year, event_name, session_type)
                 return False
         
         # Try to load the session with retries
@@ -224,11 +311,10 @@ def update_session(year, event_name, session_type, session_service, retry_count=
                 session_service.get_session(year, event_name, session_type)
                 
                 # If we get here, the session was loaded successfully
-                logger.info(f"Successfully updated {year} {event_name} {session_type}")
+                logger.info("Successfully updated %s %s %s", year, event_name, session_type)
                 
                 # Update stats
-                usage_stats['session_types'][session_type]['successful'] += 1
-                usage_stats['successful_sessions'] += 1
+                count_session(session_type, 'successful')
                 
                 # Update memory stats
                 update_memory_stats()
@@ -236,108 +322,165 @@ def update_session(year, event_name, session_type, session_service, retry_count=
                 return True
             except Exception as e:
                 if attempt < retry_count - 1:
-                    logger.warning(f"Attempt {attempt+1}/{retry_count} failed for {year} {event_name} {session_type}: {e}")
+                    logger.warning("Attempt %s/%s failed for %s %s %s: %s", attempt+1, retry_count, year, event_name, session_type, e)
                     time.sleep(2)  # Wait before retrying
                 else:
-                    logger.error(f"Failed to update {year} {event_name} {session_type} after {retry_count} attempts: {e}")
+                    logger.error("Failed to update %s %s %s after %s attempts: %s", year, event_name, session_type, retry_count, e)
                     
                     # Update stats
-                    usage_stats['session_types'][session_type]['failed'] += 1
-                    usage_stats['failed_sessions'] += 1
+                    count_session(session_type, 'failed')
                     
                     return False
     except Exception as e:
-        logger.error(f"Error updating {year} {event_name} {session_type}: {e}")
+        logger.error("Error updating %s %s %s: %s", year, event_name, session_type, e)
         
         # Update stats
-        usage_stats['session_types'][session_type]['failed'] += 1
-        usage_stats['failed_sessions'] += 1
+        count_session(session_type, 'failed')
         
         return False
 
-def update_event(event, session_service, prioritize=False, retry_count=3):
-    """Update all available sessions for an event."""
+def update_event(event, session_service, prioritize=False, retry_count=3, event_sessions=None):
+    """
+    Update all available sessions for an event.
+    
+    event_sessions is the event's session list from a year-wide lookup; the
+    sessions are looked up for this event alone when it is not given.
+    """
     year = event['year']
     event_name = event['name']
-    logger.info(f"Updating event: {year} {event_name}")
+    logger.info("Updating event: %s %s", year, event_name)
     
     # Get available sessions for this event
-    available_sessions = get_available_sessions_for_event(year, event_name, session_service)
-    logger.info(f"Available sessions for {year} {event_name}: {available_sessions}")
+    if event_sessions is not None:
+        sessions_by_code = {session['code']: session for session in event_sessions}
+    else:
+        sessions_by_code = get_available_sessions_for_event(year, event_name, session_service)
+    available_sessions = list(sessions_by_code)
+    logger.info("Available sessions for %s %s: %s", year, event_name, available_sessions)
     
     # Prioritize sessions if requested
     if prioritize and available_sessions:
         available_sessions = prioritize_sessions(available_sessions)
-        logger.info(f"Prioritized sessions for {year} {event_name}: {available_sessions}")
+        logger.info("Prioritized sessions for %s %s: %s", year, event_name, available_sessions)
     
+    # Session downloads are I/O-bound, so load them concurrently; submitting in
+    # priority order still starts the important sessions first
     results = {}
-    for session_type in available_sessions:
-        result = update_session(year, event_name, session_type, session_service, retry_count)
-        results[session_type] = result
-        
-        # Periodically trigger garbage collection to free memory
-        gc.collect()
+    with ThreadPoolExecutor(max_workers=len(SESSION_PRIORITY)) as executor:
+        futures = {
+            executor.submit(
+                update_session, year, event_name, session_type, session_service,
+                retry_count, sessions_by_code[session_type]
+            ): session_type
+            for session_type in available_sessions
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
     
     # Log results
     successful = sum(1 for result in results.values() if result)
     total = len(results)
-    logger.info(f"Updated {successful}/{total} sessions for {year} {event_name}")
+    logger.info("Updated %s/%s sessions for %s %s", successful, total, year, event_name)
     
     return results
 
+async def update_events(events, session_service, prioritize=False, retry_count=3, parallel_events=4):
+    """
+    Update several events concurrently.
+    
+    Each event is independent and I/O-bound, so up to parallel_events of them
+    run at once on the default executor.
+    
+    Args:
+        events: Events to update
+        session_service: SessionService instance
+        prioritize: Whether to prioritize important sessions
+        retry_count: Number of retry attempts for failed downloads
+        parallel_events: Maximum number of events updated at the same time
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(parallel_events)
+    
+    # Look up the sessions of every event once per year instead of once per event
+    sessions_by_year = {}
+    for year in {event['year'] for event in events}:
+        try:
+            sessions_by_year[year] = await loop.run_in_executor(None, session_service.get_session_types_for_year, year)
+        except Exception as e:
+            logger.warning("Could not get session types for %s: %s", year, e)
+    
+    async def process_event(event):
+        event_sessions = sessions_by_year.get(event['year'], {}).get(event['name'])
+        async with semaphore:
+            await loop.run_in_executor(
+                None, update_event, event, session_service, prioritize, retry_count, event_sessions
+            )
+    
+    results = await asyncio.gather(*(process_event(event) for event in events), return_exceptions=True)
+    for event, result in zip(events, results):
+        if isinstance(result, Exception):
+            logger.error("Error updating %s %s: %s", event['year'], event['name'], result)
+
 def save_stats(stats_file):
     """Save usage statistics to a JSON file."""
     try:
-        with open(stats_file, 'w') as f:
-            json.dump(usage_stats, f, indent=2)
-        logger.info(f"Statistics saved to {stats_file}")
+        # Write to a temporary file and swap it in, so a failed write never leaves a truncated file
+        tmp_file = f"{stats_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(usage_stats.to_dict(), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_file, stats_file)
+        logger.info("Statistics saved to %s", stats_file)
     except Exception as e:
-        logger.error(f"Error saving statistics: {e}")
+        logger.error("Error saving statistics: %s", e)
 
 def main():
     """Main function to update F1 data."""
     args = parse_args()
     
     # Initialize usage statistics
-    usage_stats['start_time'] = datetime.now().isoformat()
+    usage_stats.start_time = datetime.now().isoformat()
     
     # Create cache directory if it doesn't exist
     os.makedirs(args.cache_dir, exist_ok=True)
     
-    # Enable FastF1 cache
-    fastf1.Cache.enable_cache(args.cache_dir)
+    # Enable FastF1 cache with the shared connection pool
+    enable_cache(args.cache_dir)
     
-    # Create SessionService with increased cache size
-    session_service = SessionService(max_cache_size=args.max_cache_size)
+    # Use the shared SessionService with an increased cache size
+    SessionService.max_cache_size = args.max_cache_size
+    session_service = SessionService
+    
+    # Move everything loaded so far (FastF1, pandas, the services) out of the
+    # collector's reach, so later collections only scan objects from the update
+    gc.collect()
+    gc.freeze()
     
     # Get events to update
     events = get_recent_and_upcoming_events(
         session_service, args.lookback_days, args.lookahead_days
     )
-    logger.info(f"Found {len(events)} events to update")
-    usage_stats['events_processed'] = len(events)
+    logger.info("Found %s events to update", len(events))
+    usage_stats.events_processed = len(events)
     
-    # Update each event
-    for event in events:
-        update_event(event, session_service, args.prioritize, args.retry)
-        
-        # Periodically trigger garbage collection to free memory
-        gc.collect()
+    # Update the events concurrently
+    asyncio.run(update_events(events, session_service, args.prioritize, args.retry, args.parallel_events))
     
     # Update end time
-    usage_stats['end_time'] = datetime.now().isoformat()
+    usage_stats.end_time = datetime.now().isoformat()
     
     # Save statistics
     save_stats(args.stats_file)
     
     # Log summary
-    logger.info(f"Update complete. Successfully updated {usage_stats['successful_sessions']}/{usage_stats['total_sessions']} sessions.")
-    if usage_stats['total_sessions'] > 0:
-        success_rate = (usage_stats['successful_sessions'] / usage_stats['total_sessions']) * 100
-        logger.info(f"Success rate: {success_rate:.2f}%")
+    successful = usage_stats.sessions['successful']
+    total = usage_stats.sessions['total']
+    logger.info("Update complete. Successfully updated %s/%s sessions.", successful, total)
+    if total > 0:
+        success_rate = (successful / total) * 100
+        logger.info("Success rate: %.2f%%", success_rate)
 
 if __name__ == "__main__":
     start_time = time.time()
     main()
     elapsed = time.time() - start_time
-    logger.info(f"Total execution time: {elapsed:.2f} seconds")
+    logger.info("Total execution time: %.2f seconds", elapsed)
@@ -2,7 +2,10 @@
 Service for handling F1 qualifying lap time prediction.
 """
 
+import json
 import logging
+import threading
+from collections import OrderedDict
 import fastf1
 import xgboost as xgb
 from sklearn.model_selection import train_test_split
@@ -13,75 +16,193 @@ import os
 
 logger = logging.getLogger('f1webapp')
 
+# XGBoost gets slower past ~8 threads on training sets this small
+DEFAULT_N_JOBS = min(8, os.cpu_count() or 1)
+
 class PredictionService:
     """
     Service for predicting F1 qualifying lap times.
     """
 
-    def __init__(self, session_service=None):
+    # Feature columns that are one-hot encoded
+    CATEGORICAL_COLS = ['Compound', 'Driver', 'Team', 'TrackID']
+
+    # Number of race weekends whose prepared training data is kept in memory
+    TRAINING_DATA_CACHE_SIZE = 128
+
+    def __init__(self, session_service=None, n_jobs=None):
         """
         Initialize the prediction service.
         
         Args:
             session_service: Optional SessionService instance for session caching
+            n_jobs: Threads XGBoost uses to train and predict (default: DEFAULT_N_JOBS)
         """
         from services.session_service import SessionService
         self.session_service = session_service or SessionService
+        self.n_jobs = n_jobs or DEFAULT_N_JOBS
         
         # Get the absolute path to the models directory
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.model_path = os.path.join(base_dir, 'models', 'trained_models', 'qualifying_time_predictor.json')
         
-        self.model = self._load_model()
+        # Prepared (features, labels) per (year, race) in LRU order, so retraining doesn't reload and rebuild them
+        self.training_data_cache = OrderedDict()
+        
+        # Guards swapping the model, categories and feature names, which a
+        # background training job replaces while predictions are served
+        self._model_lock = threading.Lock()
+        
         self.feature_names = None
+        self._feature_index = None
+        self.model = self._load_model()
+
+    def _saved_model_stamp(self):
+        """
+        Get the modification time of the saved model.
+        
+        The categories file is replaced last when a model is saved, so its
+        mtime changes only once the whole model is in place; models saved
+        without categories fall back to the model file's mtime.
+        
+        Returns:
+            int: The mtime in nanoseconds, or None if no model is saved
+        """
+        categories_path = self.model_path.replace('.json', '_categories.json')
+        for path in (categories_path, self.model_path):
+            try:
+                return os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return None
 
     def _load_model(self):
         """
-        Load the trained XGBoost model and feature names.
+        Load the trained XGBoost model, feature names and categories.
         """
         feature_names_path = self.model_path.replace('.json', '_features.json')
+        categories_path = self.model_path.replace('.json', '_categories.json')
+        self.categories = None
+        self._loaded_model_stamp = self._saved_model_stamp()
         if os.path.exists(self.model_path) and os.path.exists(feature_names_path):
             logger.info(f"Loading model from {self.model_path}")
             model = xgb.XGBRegressor()
             model.load_model(self.model_path)
+            model.set_params(n_jobs=self.n_jobs)
             
             logger.info(f"Loading feature names from {feature_names_path}")
             with open(feature_names_path, 'r') as f:
                 self.feature_names = json.load(f)
+            self._feature_index = pd.Index(self.feature_names)
+            
+            # Models saved before categories were stored fall back to aligning columns by name
+            if os.path.exists(categories_path):
+                with open(categories_path, 'r') as f:
+                    self.categories = json.load(f)
             
             return model
         else:
             logger.warning(f"Model file or feature names file not found. The model needs to be trained.")
             return None
 
-    def _get_telemetry_features(self, lap):
+    def _telemetry_features_for_laps(self, laps):
+        """
+        Extract telemetry features for every lap in a set of laps.
+        
+        Args:
+            laps: The laps to extract features for
+            
+        Returns:
+            tuple: Arrays of average RPM, full-throttle fraction and braking
+                fraction, one entry per lap (NaN where telemetry is unavailable)
         """
-        Extract telemetry features for a given lap.
+        n = len(laps)
+        avg_rpm = np.empty(n)
+        full_throttle_percent = np.empty(n)
+        braking_percent = np.empty(n)
+
+        for i, (_, lap) in enumerate(laps.iterrows()):
+            try:
+                telemetry = lap.get_telemetry()
+                
+                rpm = telemetry['RPM'].to_numpy(dtype=np.float32)
+                throttle = telemetry['Throttle'].to_numpy(dtype=np.float32)
+                brake = telemetry['Brake'].to_numpy()
+                samples = len(rpm)
+
+                avg_rpm[i] = np.nanmean(rpm)
+                full_throttle_percent[i] = np.count_nonzero(throttle == 100) / samples
+                braking_percent[i] = np.count_nonzero(brake == True) / samples
+            except Exception as e:
+                logger.error(f"Could not get telemetry for lap {lap['LapNumber']}: {e}")
+                avg_rpm[i] = full_throttle_percent[i] = braking_percent[i] = np.nan
+
+        return avg_rpm, full_throttle_percent, braking_percent
+
+    def _encode_features(self, features_df, categories):
         """
-        try:
-            telemetry = lap.get_telemetry()
+        One-hot encode the categorical feature columns.
+        
+        The columns are first given the categories seen in training, so the
+        dummies come out as exactly the trained feature columns; values
+        outside them are encoded as missing.
+        
+        Args:
+            features_df: Lap features, as built by _prepare_data_for_session
+            categories: The trained categories of each categorical column
+            
+        Returns:
+            DataFrame: The encoded features
+        """
+        features_df = features_df.assign(**{
+            col: pd.Categorical(features_df[col], categories=categories[col])
+            for col in self.CATEGORICAL_COLS
+        })
+        return pd.get_dummies(features_df, columns=self.CATEGORICAL_COLS, dummy_na=True)
+
+    def _lap_features(self, session, laps, race):
+        """
+        Build the feature rows for a practice session's laps.
+        
+        Args:
+            session: The practice session the laps come from
+            laps: The (non-empty) laps to build features for
+            race: The race name, used as the track identifier
             
-            avg_rpm = telemetry['RPM'].mean()
-            full_throttle_percent = (telemetry['Throttle'] == 100).mean()
-            braking_percent = (telemetry['Brake'] == True).mean()
-
-            return {
-                'AvgRPM': avg_rpm,
-                'FullThrottlePercent': full_throttle_percent,
-                'BrakingPercent': braking_percent
-            }
-        except Exception as e:
-            logger.error(f"Could not get telemetry for lap {lap['LapNumber']}: {e}")
-            return {
-                'AvgRPM': np.nan,
-                'FullThrottlePercent': np.nan,
-                'BrakingPercent': np.nan
-            }
+        Returns:
+            DataFrame: One row of features per lap
+        """
+        lap_times = laps['LapTime'].dt.total_seconds()
+        session_df = pd.DataFrame({
+            'LapTime': lap_times.to_numpy(),
+            'Compound': laps['Compound'].to_numpy(),
+            'TyreLife': laps['TyreLife'].to_numpy(),
+            'Driver': laps['Driver'].to_numpy(),
+            'Team': laps['Team'].to_numpy(),
+            'TrackID': race,
+            'TrackTemp': session.weather_data['TrackTemp'].mean(), # Average track temp for the session
+            'StDevLapTime': lap_times.groupby(laps['Driver']).transform('std').to_numpy()
+        })
+
+        avg_rpm, full_throttle_percent, braking_percent = self._telemetry_features_for_laps(laps)
+        session_df['AvgRPM'] = avg_rpm
+        session_df['FullThrottlePercent'] = full_throttle_percent
+        session_df['BrakingPercent'] = braking_percent
+        return session_df
 
     def _prepare_data_for_session(self, year, race):
         """
         Prepare training data for a single race weekend.
+        
+        Non-empty results are cached per (year, race); weekends that fail to
+        load or yield no data are retried on the next call, since their data
+        may not have been published yet.
         """
+        cache_key = (year, race)
+        if cache_key in self.training_data_cache:
+            self.training_data_cache.move_to_end(cache_key)
+            return self.training_data_cache[cache_key]
+
         # Load all practice sessions and qualifying
         sessions = {}
         for session_name in ['FP1', 'FP2', 'FP3', 'Q']:
@@ -102,117 +223,122 @@ class PredictionService:
         # Get qualifying results
         quali_results = sessions['Q'].results
 
-        all_laps_data = []
+        session_frames = []
 
         for session_name in ['FP1', 'FP2', 'FP3']:
             session = sessions[session_name]
             practice_laps = session.laps.pick_quicklaps() # Laps within 107% of fastest
+            if not practice_laps.empty:
+                session_frames.append(self._lap_features(session, practice_laps, race))
 
-            for _, lap in practice_laps.iterrows():
-                lap_data = {
-                    'LapTime': lap['LapTime'].total_seconds(),
-                    'Compound': lap['Compound'],
-                    'TyreLife': lap['TyreLife'],
-                    'Driver': lap['Driver'],
-                    'Team': lap['Team'],
-                    'TrackID': race,
-                    'TrackTemp': session.weather_data['TrackTemp'].mean(), # Average track temp for the session
-                    'StDevLapTime': practice_laps[practice_laps['Driver'] == lap['Driver']]['LapTime'].dt.total_seconds().std()
-                }
-
-                telemetry_features = self._get_telemetry_features(lap)
-                lap_data.update(telemetry_features)
-
-                all_laps_data.append(lap_data)
-
-        if not all_laps_data:
+        if not session_frames:
             return pd.DataFrame(), pd.Series()
 
-        features_df = pd.DataFrame(all_laps_data)
-        
-        # Get labels
-        labels = []
-        for _, row in features_df.iterrows():
-            driver_quali_result = quali_results[quali_results['Abbreviation'] == row['Driver']]
-            if not driver_quali_result.empty:
-                q1 = driver_quali_result['Q1'].iloc[0]
-                q2 = driver_quali_result['Q2'].iloc[0]
-                q3 = driver_quali_result['Q3'].iloc[0]
-                
-                fastest_quali_lap = min(q for q in [q1, q2, q3] if pd.notna(q))
-                if pd.notna(fastest_quali_lap):
-                    labels.append(fastest_quali_lap.total_seconds())
-                else:
-                    labels.append(np.nan)
-            else:
-                labels.append(np.nan)
+        features_df = pd.concat(session_frames, ignore_index=True)
         
-        labels_s = pd.Series(labels, index=features_df.index)
+        # Get labels: each driver's fastest qualifying lap, mapped onto their practice laps
+        fastest_quali = quali_results.set_index('Abbreviation')[['Q1', 'Q2', 'Q3']].min(axis=1).dt.total_seconds()
+        labels_s = features_df['Driver'].map(fastest_quali)
 
         # Drop rows where we couldn't get a label
-        valid_indices = labels_s.dropna().index
-        features_df = features_df.loc[valid_indices].reset_index(drop=True)
-        labels_s = labels_s.loc[valid_indices].reset_index(drop=True)
-
+        valid = labels_s.notna()
+        features_df = features_df.loc[valid].reset_index(drop=True)
+        labels_s = labels_s.loc[valid].reset_index(drop=True)
+
+        if not features_df.empty:
+            self.training_data_cache[cache_key] = (features_df, labels_s)
+            if len(self.training_data_cache) > self.TRAINING_DATA_CACHE_SIZE:
+                self.training_data_cache.popitem(last=False)
         return features_df, labels_s
 
     def train_model(self, years, races, update=False):
         """
         Train or update the XGBoost model.
         """
-        all_features_df = pd.DataFrame()
-        all_labels_s = pd.Series(dtype=np.float64)
+        features_list = []
+        labels_list = []
 
         for year in years:
             for race in races:
                 features_df, labels_s = self._prepare_data_for_session(year, race)
                 if not features_df.empty:
-                    all_features_df = pd.concat([all_features_df, features_df], ignore_index=True)
-                    all_labels_s = pd.concat([all_labels_s, labels_s], ignore_index=True)
+                    features_list.append(features_df)
+                    labels_list.append(labels_s)
+
+        if not features_list:
+            raise ValueError("No data available for training.")
 
-        if all_features_df.empty:
-            logger.error("No data available for training.")
-            return
+        all_features_df = pd.concat(features_list, ignore_index=True)
+        all_labels_s = pd.concat(labels_list, ignore_index=True)
 
-        # One-hot encode categorical features
-        X = pd.get_dummies(all_features_df, columns=['Compound', 'Driver', 'Team', 'TrackID'], dummy_na=True)
+        # One-hot encode categorical features, remembering the categories for prediction
+        categories = {
+            col: all_features_df[col].astype('category').cat.categories.tolist()
+            for col in self.CATEGORICAL_COLS
+        }
+        X = self._encode_features(all_features_df, categories)
         y = all_labels_s
 
-        # Handle missing values
-        X = X.fillna(X.mean())
+        # Handle missing values; XGBoost works on float32 internally
+        X = X.fillna(X.mean()).astype(np.float32)
         
-        self.feature_names = X.columns.tolist()
+        feature_names = X.columns.tolist()
 
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-        if update and self.model:
+        # Fit a new model object so predictions keep using the current one until the swap
+        current_model = self.model
+        if update and current_model:
             logger.info("Updating existing model.")
-            self.model.fit(X_train, y_train, xgb_model=self.model.get_booster())
+            model = xgb.XGBRegressor(**current_model.get_params())
+            model.fit(X_train, y_train, xgb_model=current_model.get_booster().copy())
         else:
             logger.info("Training new model.")
-            model = xgb.XGBRegressor(objective='reg:squarederror', n_estimators=100, learning_rate=0.1, max_depth=5)
+            model = xgb.XGBRegressor(objective='reg:squarederror', n_estimators=100, learning_rate=0.1, max_depth=5,
+                                     tree_method='hist', max_bin=256, n_jobs=self.n_jobs)
             model.fit(X_train, y_train)
-            self.model = model
 
-        y_pred = self.model.predict(X_test)
+        y_pred = model.predict(X_test)
         mse = mean_squared_error(y_test, y_pred)
         logger.info(f"Model training complete. MSE: {mse}")
 
-        # Save the model and feature names
+        # Save the model, feature names and categories
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-        self.model.save_model(self.model_path)
-        logger.info(f"Model saved to {self.model_path}")
-        
         feature_names_path = self.model_path.replace('.json', '_features.json')
-        with open(feature_names_path, 'w') as f:
-            json.dump(self.feature_names, f)
-        logger.info(f"Feature names saved to {feature_names_path}")
+        categories_path = self.model_path.replace('.json', '_categories.json')
+        
+        # Write temporary files first and move them into place together, so a
+        # failed save never leaves a model next to another model's features
+        model_tmp_path = self.model_path.replace('.json', '.tmp.json')  # XGBoost picks the format from the extension
+        model.save_model(model_tmp_path)
+        for path, data in ((feature_names_path, feature_names), (categories_path, categories)):
+            with open(f"{path}.tmp", 'w') as f:
+                json.dump(data, f)
+        os.replace(model_tmp_path, self.model_path)
+        os.replace(f"{feature_names_path}.tmp", feature_names_path)
+        os.replace(f"{categories_path}.tmp", categories_path)
+        logger.info(f"Model, feature names and categories saved to {os.path.dirname(self.model_path)}")
+
+        # Swap everything predictions depend on at once
+        with self._model_lock:
+            self.model = model
+            self.categories = categories
+            self.feature_names = feature_names
+            self._feature_index = X.columns
+            self._loaded_model_stamp = self._saved_model_stamp()
 
     def predict_lap_time(self, year, race, driver):
         """
         Predict the qualifying lap time for a given driver.
         """
-        if self.model is None:
+        # Use one consistent model, categories and feature names even if training swaps them meanwhile
+        with self._model_lock:
+            # Another server process may have trained and saved a newer model
+            if self._saved_model_stamp() != self._loaded_model_stamp:
+                self.model = self._load_model()
+            model, categories, feature_index = self.model, self.categories, self._feature_index
+
+        if model is None:
             raise Exception("Model not loaded. Please train the model first.")
 
         # Prepare data for prediction (similar to training data prep)
@@ -229,36 +355,29 @@ class PredictionService:
         if any(s.weather_data['Rainfall'].any() for s in sessions.values()):
             raise Exception("Cannot predict for a wet session.")
 
-        all_laps_data = []
+        session_frames = []
         for session_name in ['FP1', 'FP2', 'FP3']:
             session = sessions[session_name]
             driver_laps = session.laps.pick_driver(driver).pick_quicklaps()
             if not driver_laps.empty:
-                for _, lap in driver_laps.iterrows():
-                    lap_data = {
-                        'LapTime': lap['LapTime'].total_seconds(),
-                        'Compound': lap['Compound'],
-                        'TyreLife': lap['TyreLife'],
-                        'Driver': lap['Driver'],
-                        'Team': lap['Team'],
-                        'TrackID': race,
-                        'TrackTemp': session.weather_data['TrackTemp'].mean(),
-                        'StDevLapTime': driver_laps['LapTime'].dt.total_seconds().std()
-                    }
-                    telemetry_features = self._get_telemetry_features(lap)
-                    lap_data.update(telemetry_features)
-                    all_laps_data.append(lap_data)
+                session_frames.append(self._lap_features(session, driver_laps, race))
         
-        if not all_laps_data:
+        if not session_frames:
             raise Exception(f"No representative practice laps found for driver {driver}.")
 
-        features_df = pd.DataFrame(all_laps_data)
+        features_df = pd.concat(session_frames, ignore_index=True)
         
         # One-hot encode and align columns with the trained model
-        X = pd.get_dummies(features_df, columns=['Compound', 'Driver', 'Team', 'TrackID'], dummy_na=True)
-        X = X.reindex(columns=self.feature_names, fill_value=0)
+        if categories is not None:
+            X = self._encode_features(features_df, categories)
+        else:
+            X = pd.get_dummies(features_df, columns=self.CATEGORICAL_COLS, dummy_na=True)
+            X = X.reindex(columns=feature_index, fill_value=0)
         X = X.fillna(X.mean())
 
-        # Predict the qualifying time for each practice lap and take the average
-        predictions = self.model.predict(X)
+        # Predict the qualifying time for each practice lap and take the average.
+        # Features are already aligned, so run the booster directly on a
+        # contiguous float32 matrix instead of going through the sklearn wrapper.
+        features = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+        predictions = model.get_booster().inplace_predict(features)
         return float(predictions.mean())
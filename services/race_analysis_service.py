@@ -3,13 +3,12 @@ Service for handling F1 race analysis.
 """
 
 import logging
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 import fastf1
 import fastf1.plotting
-from matplotlib import pyplot as plt
-import seaborn as sns
-import os
 from api.config import get_config
 
 logger = logging.getLogger('f1webapp')
@@ -24,6 +23,9 @@ class RaceAnalysisService:
     Service for analyzing F1 race data.
     """
     
+    # Number of (session, driver) fastest-lap telemetry entries kept in memory
+    TELEMETRY_CACHE_SIZE = 64
+    
     def __init__(self, session_service=None):
         """
         Initialize the race analysis service.
@@ -34,6 +36,10 @@ class RaceAnalysisService:
         from services.session_service import SessionService
         self.session_service = session_service or SessionService
         
+        # Fastest-lap telemetry columns as read-only NumPy arrays, in LRU order
+        self.telemetry_cache = OrderedDict()
+        self._telemetry_lock = threading.Lock()
+        
     def get_session(self, year, race, session_type='R'):
         """
         Get a FastF1 session using the SessionService cache.
@@ -46,9 +52,48 @@ class RaceAnalysisService:
         Returns:
             fastf1.core.Session: The loaded session
         """
-        logger.info(f"Getting session data for {year} {race} {session_type}")
+        logger.info("Getting session data for %s %s %s", year, race, session_type)
         return self.session_service.get_session(int(year), race, session_type)
         
+    def get_lap_telemetry(self, session, driver):
+        """
+        Get the telemetry columns of a driver's fastest lap as NumPy arrays.
+        
+        Results are cached per session and driver, so the lap sections of
+        every section type, and repeat requests, share one telemetry load.
+        
+        Args:
+            session: The FastF1 session
+            driver: The driver code
+            
+        Returns:
+            dict: Read-only column arrays, with 'Time' in seconds from the start of the lap
+        """
+        key = (session.event.year, session.event['EventName'], session.name, driver)
+        
+        with self._telemetry_lock:
+            if key in self.telemetry_cache:
+                self.telemetry_cache.move_to_end(key)
+                return self.telemetry_cache[key]
+        
+        telemetry = session.laps.pick_drivers(driver).pick_fastest().get_telemetry()
+        
+        time = telemetry['Time'].dt.total_seconds().to_numpy()
+        arrays = {'Time': time - time[0]}  # Normalize to start at 0
+        arrays['Speed'] = np.ascontiguousarray(telemetry['Speed'].to_numpy())  # Returned to clients, so kept exact
+        for column in ('Throttle', 'nGear'):
+            arrays[column] = np.ascontiguousarray(telemetry[column].to_numpy(dtype=np.float32))
+        arrays['Brake'] = np.ascontiguousarray(telemetry['Brake'].to_numpy(dtype=bool))
+        for array in arrays.values():
+            array.flags.writeable = False
+        
+        with self._telemetry_lock:
+            self.telemetry_cache[key] = arrays
+            if len(self.telemetry_cache) > self.TELEMETRY_CACHE_SIZE:
+                self.telemetry_cache.popitem(last=False)
+        
+        return arrays
+        
     def get_race_pace_data(self, session, num_drivers=10):
         """
         Get race pace comparison data for the top drivers.
@@ -62,8 +107,7 @@ class RaceAnalysisService:
         """
         # Get the top drivers
         point_finishers = session.drivers[:num_drivers]
-        driver_laps = session.laps.pick_drivers(point_finishers).pick_quicklaps()
-        driver_laps = driver_laps.reset_index()
+        driver_laps = session.laps.pick_drivers(point_finishers).pick_quicklaps()[["Driver", "LapTime", "Compound"]]
         
         # Get the finishing order
         finishing_order = [session.get_driver(i)["Abbreviation"] for i in point_finishers]
@@ -116,41 +160,38 @@ class RaceAnalysisService:
         # Get quick laps
         laps = session.laps.pick_quicklaps()
         
-        # Convert lap times to seconds for analysis
-        transformed_laps = laps.copy()
-        transformed_laps.loc[:, "LapTime (s)"] = laps["LapTime"].dt.total_seconds()
-        
-        # Order teams from fastest to slowest
-        team_order = (
-            transformed_laps[["Team", "LapTime (s)"]]
-            .groupby("Team")
-            .median()["LapTime (s)"]
-            .sort_values()
-            .index
+        # Convert lap times to seconds for analysis, copying only the columns used
+        transformed_laps = pd.DataFrame({
+            "Team": laps["Team"].to_numpy(),
+            "LapTime (s)": laps["LapTime"].dt.total_seconds().to_numpy()
+        })
+        
+        # Lap time statistics for every team in one pass, ordered from fastest to slowest
+        team_stats = (
+            transformed_laps
+            .groupby("Team")["LapTime (s)"]
+            .describe(percentiles=[0.25, 0.5, 0.75])
+            .sort_values("50%")
         )
         
         # Get team colors
         team_colors = fastf1.plotting.get_team_color_mapping(session=session)
         
         # Process data for each team
-        teams_data = []
-        for team in team_order:
-            team_data = transformed_laps[transformed_laps['Team'] == team]
-            if not team_data.empty:
-                # Calculate statistics
-                lap_times = team_data["LapTime (s)"]
-                
-                teams_data.append({
-                    "name": team,
-                    "color": team_colors.get(team, "#FFFFFF"),
-                    "lapTimes": {
-                        "min": lap_times.min(),
-                        "q1": lap_times.quantile(0.25),
-                        "median": lap_times.median(),
-                        "q3": lap_times.quantile(0.75),
-                        "max": lap_times.max()
-                    }
-                })
+        teams_data = [
+            {
+                "name": team,
+                "color": team_colors.get(team, "#FFFFFF"),
+                "lapTimes": {
+                    "min": stats["min"],
+                    "q1": stats["25%"],
+                    "median": stats["50%"],
+                    "q3": stats["75%"],
+                    "max": stats["max"]
+                }
+            }
+            for team, stats in team_stats.to_dict("index").items()
+        ]
         
         # Return structured data
         return {
@@ -185,45 +226,48 @@ class RaceAnalysisService:
         # Get driver colors
         driver_colors = fastf1.plotting.get_driver_color_mapping(session=session)
         
+        # Load each driver's fastest-lap telemetry once for all section types
+        driver_telemetry = {}
+        for driver in drivers:
+            try:
+                driver_telemetry[driver] = self.get_lap_telemetry(session, driver)
+            except Exception as e:
+                logger.error("Error processing lap sections for driver %s: %s", driver, e)
+        
         # Process data for each section type
         sections_data = []
         for section_type in section_types:
             drivers_data = []
             
-            for driver in drivers:
-                try:
-                    lap = session.laps.pick_drivers(driver).pick_fastest()
-                    telemetry = lap.get_telemetry()
-                    
-                    time = telemetry['Time'].dt.total_seconds().tolist()
-                    time = [t - time[0] for t in time]  # Normalize to start at 0
-                    
-                    # Define the sections based on telemetry
-                    if section_type == 'braking':
-                        mask = telemetry['Brake'] > 0
-                    elif section_type == 'full_throttle':
-                        mask = telemetry['Throttle'] == 100
-                    elif section_type == 'cornering':
-                        mask = (telemetry['nGear'] < 5) & (telemetry['Speed'] > 100)  # Simplified cornering detection
-                    elif section_type == 'acceleration':
-                        mask = (telemetry['Throttle'] > 80) & (telemetry['Throttle'] < 100)
-                    else:
-                        continue
-                    
-                    # Extract data for this section
-                    section_time = [time[i] for i in range(len(time)) if mask.iloc[i]]
-                    section_speed = [telemetry['Speed'].iloc[i] for i in range(len(time)) if mask.iloc[i]]
-                    
-                    # Only add if we have data
-                    if section_time and section_speed:
-                        drivers_data.append({
-                            "code": driver,
-                            "color": driver_colors.get(driver, "#FFFFFF"),
-                            "time": section_time,
-                            "speed": section_speed
-                        })
-                except Exception as e:
-                    logger.error(f"Error processing lap sections for driver {driver}: {e}")
+            for driver, telemetry in driver_telemetry.items():
+                time = telemetry['Time']
+                speed = telemetry['Speed']
+                throttle = telemetry['Throttle']
+                
+                # Define the sections based on telemetry
+                if section_type == 'braking':
+                    mask = telemetry['Brake'] > 0
+                elif section_type == 'full_throttle':
+                    mask = throttle == 100
+                elif section_type == 'cornering':
+                    mask = (telemetry['nGear'] < 5) & (speed > 100)  # Simplified cornering detection
+                elif section_type == 'acceleration':
+                    mask = (throttle > 80) & (throttle < 100)
+                else:
+                    continue
+                
+                # Extract data for this section
+                section_time = time[mask].tolist()
+                section_speed = speed[mask].tolist()
+                
+                # Only add if we have data
+                if section_time and section_speed:
+                    drivers_data.append({
+                        "code": driver,
+                        "color": driver_colors.get(driver, "#FFFFFF"),
+                        "time": section_time,
+                        "speed": section_speed
+                    })
             
             # Add section data if we have any drivers
             if drivers_data:
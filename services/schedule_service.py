@@ -4,12 +4,15 @@ Service for handling F1 schedule data.
 
 import logging
 import fastf1
+import numpy as np
 import pandas as pd
 import json
 import os
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
+from services.session_service import enable_cache
+from utils.concurrency import single_flight
 
 logger = logging.getLogger('f1webapp')
 
@@ -40,7 +43,7 @@ class ScheduleService:
         self.country_flags = self._load_country_flags()
         
         # Enable FastF1 cache
-        fastf1.Cache.enable_cache(self.cache_dir)
+        enable_cache(self.cache_dir)
     
     def _load_country_flags(self) -> Dict[str, str]:
         """
@@ -99,6 +102,27 @@ class ScheduleService:
         }
         logger.info(f"Cached schedule for {year}")
     
+    def _load_schedule(self, year: int) -> fastf1.events.EventSchedule:
+        """
+        Get the FastF1 schedule for a year, fetching it only on a cache miss.
+        
+        Args:
+            year: The year to get the schedule for
+            
+        Returns:
+            EventSchedule: The schedule
+        """
+        # Try to get from cache first
+        schedule, from_cache = self._get_cached_schedule(year)
+        
+        # If not in cache or expired, fetch from FastF1
+        if not from_cache:
+            logger.info(f"Fetching schedule for {year} from FastF1")
+            schedule = fastf1.get_event_schedule(year)
+            self._cache_schedule(year, schedule)
+            
+        return schedule
+    
     def _filter_testing_events(self, schedule: fastf1.events.EventSchedule) -> fastf1.events.EventSchedule:
         """
         Filter out testing events from a schedule.
@@ -109,8 +133,8 @@ class ScheduleService:
         Returns:
             EventSchedule: Filtered schedule without testing events
         """
-        # Use the is_testing method to filter out testing events
-        non_testing_events = schedule[~schedule.apply(lambda x: x.is_testing(), axis=1)]
+        # Event.is_testing() checks EventFormat, so build the same mask for every row at once
+        non_testing_events = schedule[schedule['EventFormat'].to_numpy() != 'testing']
         return non_testing_events
     
     def _get_event_status(self, event_date: pd.Timestamp) -> str:
@@ -136,6 +160,7 @@ class ScheduleService:
         # Event is in the future
         return 'future'
     
+    @single_flight
     def get_schedule(self, year=None, include_testing=False) -> Dict[str, Any]:
         """
         Get the F1 schedule for a specific year.
@@ -146,87 +171,144 @@ class ScheduleService:
             
         Returns:
             dict: Schedule data
-        """
-        try:
-            # If year is not provided, use current year
-            if not year:
-                year = datetime.now().year
-            else:
-                year = int(year)
-            
-            # Try to get from cache first
-            schedule, from_cache = self._get_cached_schedule(year)
             
-            # If not in cache or expired, fetch from FastF1
-            if not from_cache:
-                logger.info(f"Fetching schedule for {year} from FastF1")
-                schedule = fastf1.get_event_schedule(year)
-                self._cache_schedule(year, schedule)
-            
-            # Filter out testing events if requested
-            if not include_testing:
-                schedule = self._filter_testing_events(schedule)
+        Raises:
+            Exception: If the schedule cannot be loaded, so a failed load is
+                not mistaken for (and cached as) an empty schedule
+        """
+        # If year is not provided, use current year
+        if not year:
+            year = datetime.now().year
+        else:
+            year = int(year)
+        
+        schedule = self._load_schedule(year)
+        
+        # Filter out testing events if requested
+        if not include_testing:
+            schedule = self._filter_testing_events(schedule)
+        
+        # Format the response
+        races = []
+        for _, row in schedule.iterrows():
+            # Get country flag URL
+            country = row['Country']
+            flag_url = self.country_flags.get(country, None)
             
-            # Format the response
-            races = []
-            for _, row in schedule.iterrows():
-                # Get country flag URL
-                country = row['Country']
-                flag_url = self.country_flags.get(country, None)
+            # Get event sessions
+            event_sessions = []
+            for session_type in ['FP1', 'FP2', 'FP3', 'Q', 'S', 'R']:
+                session_date_col = f"{session_type}Date"
+                session_time_col = f"{session_type}Time"
                 
-                # Get event sessions
-                event_sessions = []
-                for session_type in ['FP1', 'FP2', 'FP3', 'Q', 'S', 'R']:
-                    session_date_col = f"{session_type}Date"
-                    session_time_col = f"{session_type}Time"
+                if session_date_col in row and pd.notna(row[session_date_col]) and \
+                   session_time_col in row and pd.notna(row[session_time_col]):
+                    session_date = row[session_date_col]
+                    session_time = row[session_time_col]
                     
-                    if session_date_col in row and pd.notna(row[session_date_col]) and \
-                       session_time_col in row and pd.notna(row[session_time_col]):
-                        session_date = row[session_date_col]
-                        session_time = row[session_time_col]
+                    # Convert to datetime
+                    if isinstance(session_date, str):
+                        session_date = pd.to_datetime(session_date)
+                    if isinstance(session_time, str):
+                        session_time = pd.to_datetime(session_time).time()
                         
-                        # Convert to datetime
-                        if isinstance(session_date, str):
-                            session_date = pd.to_datetime(session_date)
-                        if isinstance(session_time, str):
-                            session_time = pd.to_datetime(session_time).time()
-                            
-                        # Combine date and time
-                        session_datetime = pd.Timestamp.combine(session_date.date(), session_time)
-                        
-                        # Map session type to full name
-                        session_name = {
-                            'FP1': 'Practice 1',
-                            'FP2': 'Practice 2',
-                            'FP3': 'Practice 3',
-                            'Q': 'Qualifying',
-                            'S': 'Sprint',
-                            'R': 'Race'
-                        }.get(session_type, session_type)
-                        
-                        event_sessions.append({
-                            'type': session_name,
-                            'startTime': session_datetime.isoformat()
-                        })
-                
-                race_data = {
-                    'round': int(row['RoundNumber']),
-                    'name': row['EventName'],
-                    'location': row['Location'],
-                    'country': country,
-                    'flagUrl': flag_url,
-                    'events': event_sessions
-                }
-                races.append(race_data)
-                
-            return {
-                'year': year,
-                'races': races
+                    # Combine date and time
+                    session_datetime = pd.Timestamp.combine(session_date.date(), session_time)
+                    
+                    # Map session type to full name
+                    session_name = {
+                        'FP1': 'Practice 1',
+                        'FP2': 'Practice 2',
+                        'FP3': 'Practice 3',
+                        'Q': 'Qualifying',
+                        'S': 'Sprint',
+                        'R': 'Race'
+                    }.get(session_type, session_type)
+                    
+                    event_sessions.append({
+                        'type': session_name,
+                        'startTime': session_datetime.isoformat()
+                    })
+            
+            # Sort sessions by start time
+            event_sessions.sort(key=lambda x: x['startTime'])
+            
+            race_data = {
+                'round': int(row['RoundNumber']),
+                'name': row['EventName'],
+                'location': row['Location'],
+                'country': country,
+                'flagUrl': flag_url,
+                'events': event_sessions
             }
+            races.append(race_data)
             
-        except Exception as e:
-            logger.error(f"Error getting schedule: {e}")
-            return {'year': year, 'races': []}
+        return {
+            'year': year,
+            'races': races
+        }
+    
+    def _get_status_index(self, year: int) -> Tuple[List[Dict[str, Any]], np.ndarray, np.ndarray]:
+        """
+        Get the races for a year along with their first and last session start
+        times as int64 seconds, building and caching them on first use.
+        
+        Args:
+            year: The year to index
+            
+        Returns:
+            tuple: (races, first_start, last_start) as parallel arrays in schedule order
+        """
+        cache_key = f"status_{year}"
+        cache_entry = self.schedule_cache.get(cache_key)
+        if cache_entry and time.time() - cache_entry['time'] < self.CACHE_EXPIRATION:
+            return cache_entry['data']
+        
+        # Only races with sessions can be classified
+        races = [race for race in self.get_schedule(year).get('races', []) if race['events']]
+        
+        # Parse every first/last session start in one vectorized pass
+        start_times = np.array(
+            [race['events'][i]['startTime'] for race in races for i in (0, -1)],
+            dtype='datetime64[us]'
+        ).astype('datetime64[s]').astype(np.int64).reshape(-1, 2)
+        index = (races, start_times[:, 0].copy(), start_times[:, 1].copy())
+        
+        if races:
+            self.schedule_cache[cache_key] = {
+                'data': index,
+                'time': time.time()
+            }
+        
+        return index
+    
+    def get_events_by_status(self, year: int) -> Dict[str, Any]:
+        """
+        Get the races for a year grouped by status (past, current, future).
+        
+        A race is past once its last session is more than a day old, and
+        current from two days before its first session until then.
+        
+        Args:
+            year: The year to get the events for
+            
+        Returns:
+            dict: Races grouped by status
+        """
+        races, first_start, last_start = self._get_status_index(year)
+        
+        # Session times are naive, so compare against naive local time on the same scale
+        now = np.datetime64(datetime.now(), 's').astype(np.int64)
+        is_past = last_start < now - 24 * 60 * 60
+        is_current = ~is_past & (first_start <= now + 2 * 24 * 60 * 60)
+        is_future = ~(is_past | is_current)
+        
+        return {
+            'year': year,
+            'past': [{**races[i], 'status': 'past'} for i in np.flatnonzero(is_past)],
+            'current': [{**races[i], 'status': 'current'} for i in np.flatnonzero(is_current)],
+            'future': [{**races[i], 'status': 'future'} for i in np.flatnonzero(is_future)]
+        }
     
     def get_next_event(self) -> Dict[str, Any]:
         """
@@ -238,16 +320,16 @@ class ScheduleService:
         try:
             # Get the current year's schedule
             year = datetime.now().year
-            schedule = fastf1.get_event_schedule(year)
+            schedule = self._load_schedule(year)
             
-            # Filter future events
-            now = pd.Timestamp.now()
-            future_events = schedule[schedule['EventDate'] > now]
+            # The schedule is in date order, so binary-search for the first future event
+            event_dates = schedule['EventDate'].to_numpy(dtype='datetime64[ns]')
+            next_index = np.searchsorted(event_dates, np.datetime64(pd.Timestamp.now(), 'ns'), side='right')
             
-            if future_events.empty:
+            if next_index >= len(event_dates) or np.isnat(event_dates[next_index]):
                 # Check next year if no future events in current year
                 next_year = year + 1
-                next_year_schedule = fastf1.get_event_schedule(next_year)
+                next_year_schedule = self._load_schedule(next_year)
                 if next_year_schedule.empty:
                     logger.warning(f"No events found for {next_year}")
                     return {}
@@ -256,7 +338,7 @@ class ScheduleService:
                 next_event = next_year_schedule.iloc[0]
             else:
                 # Get the next event
-                next_event = future_events.iloc[0]
+                next_event = schedule.iloc[next_index]
             
             # Get country flag URL
             country = next_event['Country']
@@ -5,17 +5,89 @@ This service provides caching and management of FastF1 sessions.
 """
 
 import logging
+import threading
+import time
 import fastf1
-from typing import Dict, Optional, Any
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional, Any
 from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils.concurrency import single_flight
 
 logger = logging.getLogger('f1webapp')
 
+# First season with full FastF1 timing data
+FIRST_YEAR = 2018
+
+# Session codes for the FastF1 session names found in the event schedule
+SESSION_CODES = {
+    'Practice 1': 'FP1',
+    'Practice 2': 'FP2',
+    'Practice 3': 'FP3',
+    'Qualifying': 'Q',
+    'Sprint Qualifying': 'SQ',
+    'Sprint Shootout': 'SQ',
+    'Sprint': 'S',
+    'Race': 'R'
+}
+
+# Keep-alive pool shared by every FastF1 request so upstream calls reuse connections
+_http_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, backoff_factor=0.2)
+)
+
+def enable_cache(cache_dir: str) -> None:
+    """
+    Enable the FastF1 cache and mount the shared connection pool on its HTTP sessions.
+    
+    The pool is mounted through FastF1's private Cache._requests_session and
+    Cache._requests_session_cached attributes, as FastF1 has no public hook
+    for its HTTP sessions; if a FastF1 release drops them, the cache is still
+    enabled and requests fall back to FastF1's own connection handling.
+    
+    Args:
+        cache_dir: Directory for the FastF1 cache
+    """
+    fastf1.Cache.enable_cache(cache_dir)
+    
+    # FastF1 creates its requests sessions when the cache is enabled
+    mounted = False
+    for attr in ('_requests_session', '_requests_session_cached'):
+        http_session = getattr(fastf1.Cache, attr, None)
+        if http_session is not None:
+            http_session.mount('https://', _http_adapter)
+            http_session.mount('http://', _http_adapter)
+            mounted = True
+    
+    if not mounted:
+        logger.warning("FastF1 HTTP sessions not found; the shared connection pool is not used")
+
+def reset_http_sessions() -> None:
+    """
+    Close the pooled connections behind FastF1's HTTP sessions.
+    
+    Closing the sessions closes their sockets, so a download stuck on a dead
+    connection fails instead of holding it; the next request opens a fresh
+    connection through the same adapter. Like enable_cache, this relies on
+    FastF1's private Cache._requests_session attributes.
+    """
+    for attr in ('_requests_session', '_requests_session_cached'):
+        http_session = getattr(fastf1.Cache, attr, None)
+        if http_session is not None:
+            http_session.close()
+
 class _SessionService:
     """
     Service for handling F1 session data with caching.
     """
     
+    # Seconds an event schedule is reused before it is fetched again (1 hour)
+    SCHEDULE_CACHE_EXPIRATION = 60 * 60
+    
     def __init__(self, max_cache_size=10):
         """
         Initialize the session service.
@@ -25,6 +97,18 @@ class _SessionService:
         """
         self.max_cache_size = max_cache_size
         self.session_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Event schedules by year, as (schedule, fetch time)
+        self.schedule_cache = {}
+        
+        # Usage counters reported by get_stats()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'load_time_ms': 0.0
+        }
         
     def get_session(self, year: int, race: str, session_type: str) -> fastf1.core.Session:
         """
@@ -41,29 +125,329 @@ class _SessionService:
         cache_key = f"{year}_{race}_{session_type}"
         
         # Check if session is in cache
-        if cache_key in self.session_cache:
-            logger.info(f"Using cached session for {year} {race} {session_type}")
-            # Move to end to mark as recently used
-            self.session_cache.move_to_end(cache_key)
-            return self.session_cache[cache_key]
+        session = self._get_cached_session(cache_key)
+        if session is not None:
+            logger.info("Using cached session for %s %s %s", year, race, session_type)
+            return session
+        
+        # Concurrent requests for the same session share a single load
+        return self._load_session(year, race, session_type)
+    
+    def _get_cached_session(self, cache_key: str) -> Optional[fastf1.core.Session]:
+        """
+        Get a session from the cache and mark it as recently used.
+        
+        Args:
+            cache_key: The session cache key
+            
+        Returns:
+            fastf1.core.Session: The cached session, or None if it isn't cached
+        """
+        with self._cache_lock:
+            session = self.session_cache.get(cache_key)
+            if session is not None:
+                # Move to end to mark as recently used
+                self.session_cache.move_to_end(cache_key)
+                self.stats['hits'] += 1
+            return session
+    
+    @single_flight
+    def _load_session(self, year: int, race: str, session_type: str) -> fastf1.core.Session:
+        """
+        Load a FastF1 session and add it to the cache.
+        
+        Args:
+            year: The year of the session
+            race: The race name or round number
+            session_type: The session type (e.g., 'R', 'Q', 'FP1')
+            
+        Returns:
+            fastf1.core.Session: The loaded session
+        """
+        cache_key = f"{year}_{race}_{session_type}"
+        
+        # A load that finished just before this one started may have cached it already
+        session = self._get_cached_session(cache_key)
+        if session is not None:
+            return session
         
         # Load session from FastF1
-        logger.info(f"Loading session for {year} {race} {session_type}")
+        logger.info("Loading session for %s %s %s", year, race, session_type)
+        start_time = time.perf_counter()
         session = fastf1.get_session(year, race, session_type)
         session.load()
         
-        # Add to cache
-        self.session_cache[cache_key] = session
-        
-        # Remove oldest session if cache is full
-        if len(self.session_cache) > self.max_cache_size:
-            self.session_cache.popitem(last=False)
+        with self._cache_lock:
+            self.stats['misses'] += 1
+            self.stats['load_time_ms'] += (time.perf_counter() - start_time) * 1000
+            
+            # Add to cache
+            self.session_cache[cache_key] = session
+            
+            # Remove oldest session if cache is full
+            if len(self.session_cache) > self.max_cache_size:
+                self.session_cache.popitem(last=False)
+                self.stats['evictions'] += 1
         
         return session
     
+    def _get_event_schedule(self, year: int) -> fastf1.events.EventSchedule:
+        """
+        Get the event schedule for a year, excluding testing, reusing a recent copy.
+        
+        Every event and session lookup for a year shares one schedule instead
+        of parsing it again for each call.
+        
+        Args:
+            year: The year of the schedule
+            
+        Returns:
+            EventSchedule: The schedule
+        """
+        with self._cache_lock:
+            entry = self.schedule_cache.get(year)
+        if entry and time.time() - entry[1] < self.SCHEDULE_CACHE_EXPIRATION:
+            return entry[0]
+        
+        schedule = fastf1.get_event_schedule(year, include_testing=False)
+        with self._cache_lock:
+            self.schedule_cache[year] = (schedule, time.time())
+        return schedule
+    
+    def _get_event(self, year: int, race) -> fastf1.events.Event:
+        """
+        Get an event from the cached schedule, matching like fastf1.get_event.
+        
+        Args:
+            year: The year of the event
+            race: The race name, or round number as an int
+            
+        Returns:
+            Event: The event
+        """
+        schedule = self._get_event_schedule(year)
+        if isinstance(race, str):
+            return schedule.get_event_by_name(race)
+        return schedule.get_event_by_round(race)
+    
+    def get_available_years(self) -> List[int]:
+        """
+        Get all years with session data, from 2018 to the current year.
+        
+        Returns:
+            list: Available years
+        """
+        return list(range(FIRST_YEAR, datetime.now().year + 1))
+    
+    def get_events_for_year(self, year: int) -> List[Dict[str, Any]]:
+        """
+        Get all race weekends for a year, excluding testing.
+        
+        Args:
+            year: The year to get events for
+            
+        Returns:
+            list: Events with name, round, date, country and location
+        """
+        schedule = self._get_event_schedule(year)
+        
+        events = []
+        for _, event in schedule.iterrows():
+            events.append({
+                'name': event['EventName'],
+                'round': int(event['RoundNumber']),
+                'date': event['EventDate'].strftime('%Y-%m-%d') if pd.notna(event['EventDate']) else None,
+                'country': event['Country'],
+                'location': event['Location']
+            })
+        
+        return events
+    
+    def get_session_types(self, year: int, race: str) -> List[Dict[str, Any]]:
+        """
+        Get the sessions held during an event.
+        
+        Args:
+            year: The year of the event
+            race: The race name or round number
+            
+        Returns:
+            list: Sessions with code, name and date
+        """
+        return self._event_sessions(self._get_event(year, race))
+    
+    def get_session_types_for_year(self, year: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the sessions held during every event of a year.
+        
+        Reads the year's schedule once, rather than once per event.
+        
+        Args:
+            year: The year of the events
+            
+        Returns:
+            dict: Sessions with code, name and date, keyed by event name
+        """
+        schedule = self._get_event_schedule(year)
+        return {event['EventName']: self._event_sessions(event) for _, event in schedule.iterrows()}
+    
+    @staticmethod
+    def _event_sessions(event) -> List[Dict[str, Any]]:
+        """
+        Get the sessions of an event row from the schedule.
+        
+        Args:
+            event: The event (schedule row)
+            
+        Returns:
+            list: Sessions with code, name and date
+        """
+        sessions = []
+        for i in range(1, 6):
+            name = event.get(f'Session{i}')
+            if not name or name not in SESSION_CODES:
+                continue
+            
+            date = event.get(f'Session{i}Date')
+            sessions.append({
+                'code': SESSION_CODES[name],
+                'name': name,
+                'date': date.isoformat() if pd.notna(date) else None
+            })
+        
+        return sessions
+    
+    def get_drivers_in_session(self, year: int, race: str, session_type: str) -> List[Dict[str, Any]]:
+        """
+        Get all drivers who took part in a session.
+        
+        Args:
+            year: The year of the session
+            race: The race name or round number
+            session_type: The session type (e.g., 'R', 'Q', 'FP1')
+            
+        Returns:
+            list: Drivers with code, number, name and team
+        """
+        session = self.get_session(year, race, session_type)
+        
+        drivers = []
+        for driver_number in session.drivers:
+            driver = session.get_driver(driver_number)
+            drivers.append({
+                'code': driver['Abbreviation'],
+                'number': driver['DriverNumber'],
+                'name': driver['FullName'],
+                'team': driver['TeamName']
+            })
+        
+        return drivers
+    
+    def get_driver_laps(self, year: int, race: str, session_type: str, driver: str) -> List[Dict[str, Any]]:
+        """
+        Get all laps driven by one driver in a session.
+        
+        Args:
+            year: The year of the session
+            race: The race name or round number
+            session_type: The session type (e.g., 'R', 'Q', 'FP1')
+            driver: The driver code
+            
+        Returns:
+            list: Laps with number, times, tyre and stint information
+        """
+        session = self.get_session(year, race, session_type)
+        laps = session.laps.pick_drivers(driver)
+        
+        def seconds(value):
+            return value.total_seconds() if pd.notna(value) else None
+        
+        lap_data = []
+        for _, lap in laps.iterrows():
+            lap_data.append({
+                'lapNumber': int(lap['LapNumber']),
+                'lapTime': seconds(lap['LapTime']),
+                'sector1Time': seconds(lap['Sector1Time']),
+                'sector2Time': seconds(lap['Sector2Time']),
+                'sector3Time': seconds(lap['Sector3Time']),
+                'compound': lap['Compound'],
+                'tyreLife': lap['TyreLife'],
+                'stint': lap['Stint']
+            })
+        
+        return lap_data
+    
+    def prefetch_recent(self, num_events: int = 2, session_types=('R', 'Q')) -> threading.Thread:
+        """
+        Load the sessions of the most recent events in the background.
+        
+        These are the sessions users ask for most, so warming them keeps the
+        first requests after start-up from paying for a cold FastF1 load.
+        
+        Args:
+            num_events: Number of most recent events to load
+            session_types: Session types to load for each event
+            
+        Returns:
+            threading.Thread: The started prefetch thread
+        """
+        def run():
+            year = datetime.now().year
+            today = datetime.now().strftime('%Y-%m-%d')
+            
+            try:
+                events = [event for event in self.get_events_for_year(year) if event['date'] and event['date'] <= today]
+            except Exception as e:
+                logger.warning("Could not get events to prefetch for %s: %s", year, e)
+                return
+            
+            for event in reversed(events[-num_events:]):
+                for session_type in session_types:
+                    try:
+                        self.get_session(year, event['name'], session_type)
+                    except Exception as e:
+                        logger.warning("Could not prefetch %s %s %s: %s", year, event['name'], session_type, e)
+            
+            logger.info("Session prefetch complete")
+        
+        thread = threading.Thread(target=run, name='session-prefetch', daemon=True)
+        thread.start()
+        return thread
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get session cache usage statistics.
+        
+        A high eviction count relative to misses means the cache is too small
+        for the working set and sessions are being reloaded.
+        
+        Returns:
+            dict: Cache size, capacity, hit/miss/eviction counts and load times
+        """
+        with self._cache_lock:
+            stats = dict(self.stats)
+            sessions = list(self.session_cache.keys())
+        
+        hits = stats['hits']
+        misses = stats['misses']
+        requests = hits + misses
+        
+        return {
+            'size': len(sessions),
+            'capacity': self.max_cache_size,
+            'hits': hits,
+            'misses': misses,
+            'evictions': stats['evictions'],
+            'hit_rate': hits / requests if requests else None,
+            'avg_load_ms': stats['load_time_ms'] / misses if misses else None,
+            'sessions': sessions
+        }
+    
     def clear_cache(self):
-        """Clear the session cache."""
-        self.session_cache.clear()
+        """Clear the session and schedule caches."""
+        with self._cache_lock:
+            self.session_cache.clear()
+            self.schedule_cache.clear()
         logger.info("Session cache cleared")
 
 SessionService = _SessionService()
@@ -8,6 +8,8 @@ import pandas as pd
 from datetime import datetime
 import os
 from typing import Dict, List, Optional, Any
+from services.session_service import enable_cache
+from utils.concurrency import single_flight
 
 logger = logging.getLogger('f1webapp')
 
@@ -16,20 +18,25 @@ class StandingsService:
     Service for handling F1 standings data.
     """
     
-    def __init__(self, cache_dir='cache'):
+    def __init__(self, cache_dir='cache', session_service=None):
         """
         Initialize the standings service.
         
         Args:
             cache_dir: Directory for FastF1 cache
+            session_service: Optional SessionService instance for session caching
         """
+        from services.session_service import SessionService
+        self.session_service = session_service or SessionService
+        
         # Adjust paths to be relative to the app root
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.cache_dir = os.path.join(base_dir, cache_dir)
         
         # Enable FastF1 cache
-        fastf1.Cache.enable_cache(self.cache_dir)
+        enable_cache(self.cache_dir)
         
+    @single_flight
     def get_driver_standings(self, year=None):
         """
         Get driver standings for a specific year.
@@ -58,9 +65,8 @@ class StandingsService:
             # Get the latest completed event
             latest_event = completed_events.iloc[-1]
             
-            # Load the session
-            session = fastf1.get_session(year, latest_event['EventName'], 'R')
-            session.load()
+            # Load the session through the shared session cache
+            session = self.session_service.get_session(year, latest_event['EventName'], 'R')
             
             # Get driver standings
             driver_standings = session.get_driver_standings()
@@ -87,6 +93,7 @@ class StandingsService:
             logger.error(f"Error getting driver standings: {e}")
             return {"year": year if year else datetime.now().year, "standings": []}
     
+    @single_flight
     def get_constructor_standings(self, year=None):
         """
         Get constructor standings for a specific year.
@@ -115,9 +122,8 @@ class StandingsService:
             # Get the latest completed event
             latest_event = completed_events.iloc[-1]
             
-            # Load the session
-            session = fastf1.get_session(year, latest_event['EventName'], 'R')
-            session.load()
+            # Load the session through the shared session cache
+            session = self.session_service.get_session(year, latest_event['EventName'], 'R')
             
             # Get constructor standings
             constructor_standings = session.get_constructor_standings()
@@ -161,9 +167,8 @@ class StandingsService:
             events = fastf1.get_event_schedule(year)
             first_event = events.iloc[0]
             
-            # Load the session
-            session = fastf1.get_session(year, first_event['EventName'], 'R')
-            session.load()
+            # Load the session through the shared session cache
+            session = self.session_service.get_session(year, first_event['EventName'], 'R')
             
             # Get all drivers
             drivers = session.drivers
@@ -3,19 +3,25 @@ Service for handling F1 telemetry data processing.
 """
 
 import logging
+import os
+import threading
 import numpy as np
 import pandas as pd
 import fastf1
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from fastf1 import plotting
-from matplotlib import pyplot as plt
-from matplotlib.collections import LineCollection
-import seaborn as sns
 from api.config import get_config
+from utils.concurrency import single_flight
 from utils.color_mapping import get_color_mapping
 
 logger = logging.getLogger('f1webapp')
 config = get_config()
 
+# Per-driver telemetry extraction runs here; kept apart from the request pool so
+# a request waiting on its drivers can never starve them of workers
+driver_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='telemetry-drivers')
+
 # Setup FastF1 plotting
 fastf1.plotting.setup_mpl(mpl_timedelta_support=True, misc_mpl_mods=False, color_scheme='fastf1')
 
@@ -75,37 +81,33 @@ class MiniSectorAnalyzer:
             
         return self.telemetry
         
-    def find_fastest_drivers(self, drivers_telemetry_list):
+    def find_fastest_drivers(self, drivers_telemetry_list=None):
         """
         Find the fastest driver in each mini-sector.
         
         Args:
             drivers_telemetry_list: List of telemetry data for different drivers
+                (default: the analyzer's combined telemetry, which gets a MiniSector column)
             
         Returns:
             tuple: (DataFrame with the fastest driver for each mini-sector, 
                    DataFrame with all processed telemetry data)
         """
-        # Process each driver's telemetry to add mini-sectors
-        processed_telemetry_list = []
-        for telemetry in drivers_telemetry_list:
-            # Create a copy to avoid modifying the original
-            tel_copy = telemetry.copy()
-            # Add mini-sectors based on distance
-            tel_copy['MiniSector'] = pd.cut(
-                tel_copy['Distance'], 
-                self.num_sectors, 
-                labels=False
-            )
-            processed_telemetry_list.append(tel_copy)
+        # Combine all drivers' telemetry; concat builds a new frame, so the inputs are untouched
+        if drivers_telemetry_list is not None:
+            mini_sectors = pd.concat(drivers_telemetry_list, ignore_index=True)
+        else:
+            mini_sectors = self.telemetry
         
-        # Combine all drivers' processed telemetry
-        mini_sectors = pd.concat(processed_telemetry_list)
+        # Add mini-sectors based on each driver's own lap distance
+        mini_sectors['MiniSector'] = mini_sectors.groupby('Driver', sort=False)['Distance'].transform(
+            lambda distance: pd.cut(distance, self.num_sectors, labels=False)
+        )
         
-        # Calculate the time spent in each mini-sector for each driver
-        time_spent = mini_sectors.groupby(['Driver', 'MiniSector']).apply(
-            lambda df: df['Time'].diff().sum()
-        ).reset_index().rename(columns={0: 'TimeSpent'})
+        # Calculate the time spent in each mini-sector for each driver; the
+        # consecutive sample deltas sum to the last minus the first sample time
+        sector_times = mini_sectors.groupby(['Driver', 'MiniSector'])['Time'].agg(['first', 'last'])
+        time_spent = (sector_times['last'] - sector_times['first']).rename('TimeSpent').reset_index()
         
         # Find the fastest driver in each mini-sector
         fastest_per_mini_sector = time_spent.loc[
@@ -120,6 +122,12 @@ class TelemetryService:
     Service for processing and analyzing F1 telemetry data.
     """
     
+    # Number of instances created; the app is expected to share one
+    _instances = 0
+    
+    # Number of (session, driver) fastest-lap telemetry entries kept in memory
+    TELEMETRY_CACHE_SIZE = 64
+    
     def __init__(self, session_service=None):
         """
         Initialize the telemetry service.
@@ -130,6 +138,17 @@ class TelemetryService:
         from services.session_service import SessionService
         self.session_service = session_service or SessionService
         
+        # Fastest-lap telemetry columns as read-only NumPy arrays, in LRU order
+        self.telemetry_cache = OrderedDict()
+        self._telemetry_lock = threading.Lock()
+        
+        # Driver color mappings, built once per session
+        self.color_cache = {}
+        
+        TelemetryService._instances += 1
+        if TelemetryService._instances > 1:
+            logger.warning("More than one TelemetryService created; use the shared instance from get_service()")
+        
     def get_session(self, year, race, session_type):
         """
         Get a FastF1 session using the SessionService cache.
@@ -142,7 +161,7 @@ class TelemetryService:
         Returns:
             fastf1.core.Session: The loaded session
         """
-        logger.info(f"Getting session data for {year} {race} {session_type}")
+        logger.info("Getting session data for %s %s %s", year, race, session_type)
         return self.session_service.get_session(int(year), race, session_type)
         
     def get_driver_fastest_lap(self, session, driver):
@@ -158,6 +177,80 @@ class TelemetryService:
         """
         return session.laps.pick_drivers(driver).pick_fastest()
         
+    def get_driver_colors(self, session):
+        """
+        Get the driver color mapping for a session.
+        
+        The mapping is built once per session and reused by every request for
+        it, instead of rebuilding the FastF1 and default color dicts each time.
+        Callers must not mutate it.
+        
+        Args:
+            session: The FastF1 session
+            
+        Returns:
+            dict: Driver code to hex color
+        """
+        key = (session.event.year, session.event['EventName'], session.name)
+        
+        with self._telemetry_lock:
+            driver_colors = self.color_cache.get(key)
+        
+        if driver_colors is None:
+            driver_colors = get_color_mapping(session)['drivers']
+            with self._telemetry_lock:
+                self.color_cache[key] = driver_colors
+        
+        return driver_colors
+        
+    def get_lap_telemetry(self, session, driver, source='telemetry'):
+        """
+        Get a driver's fastest lap time and its telemetry columns as NumPy arrays.
+        
+        Results are cached per session and driver, so repeat requests skip
+        resampling the telemetry, and the arrays are serialized as-is by the
+        API's JSON provider without a ``.tolist()`` pass. The FastF1 lap is not
+        cached, as it holds a reference to its whole session.
+        
+        Args:
+            session: The FastF1 session
+            driver: The driver code
+            source: 'car' for car data with distance, or 'telemetry' for merged telemetry
+            
+        Returns:
+            tuple: (lap time as MM:SS.sss, dict of read-only column arrays)
+        """
+        key = (session.event.year, session.event['EventName'], session.name, driver, source)
+        
+        with self._telemetry_lock:
+            if key in self.telemetry_cache:
+                self.telemetry_cache.move_to_end(key)
+                return self.telemetry_cache[key]
+        
+        lap = self.get_driver_fastest_lap(session, driver)
+        tel = lap.get_car_data().add_distance() if source == 'car' else lap.get_telemetry()
+        
+        arrays = {}
+        for column in ('Distance', 'Speed', 'Throttle', 'Brake', 'DRS', 'nGear', 'X', 'Y'):
+            if column not in tel:
+                continue
+            array = np.ascontiguousarray(tel[column].to_numpy())
+            if array.dtype == object:
+                arrays[column] = tel[column].tolist()
+                continue
+            array.flags.writeable = False
+            arrays[column] = array
+        
+        lap_time = str(lap["LapTime"])[11:19]  # Format as MM:SS.sss
+        
+        with self._telemetry_lock:
+            self.telemetry_cache[key] = (lap_time, arrays)
+            if len(self.telemetry_cache) > self.TELEMETRY_CACHE_SIZE:
+                self.telemetry_cache.popitem(last=False)
+        
+        return lap_time, arrays
+        
+    @single_flight
     def get_speed_trace_data(self, session, driver1, driver2):
         """
         Get speed trace comparison data for two drivers.
@@ -170,22 +263,15 @@ class TelemetryService:
         Returns:
             dict: Speed trace data for interactive visualization
         """
-        driver1_lap = self.get_driver_fastest_lap(session, driver1)
-        driver2_lap = self.get_driver_fastest_lap(session, driver2)
-        
         # Get telemetry data
-        driver1_tel = driver1_lap.get_car_data().add_distance()
-        driver2_tel = driver2_lap.get_car_data().add_distance()
+        driver1_time, driver1_tel = self.get_lap_telemetry(session, driver1, 'car')
+        driver2_time, driver2_tel = self.get_lap_telemetry(session, driver2, 'car')
         
         # Get driver colors using our custom color mapping
-        driver_colors = get_color_mapping(session)['drivers']
+        driver_colors = self.get_driver_colors(session)
         driver1_color = driver_colors.get(driver1, 'white')
         driver2_color = driver_colors.get(driver2, 'white')
         
-        # Get lap times for display
-        driver1_time = str(driver1_lap["LapTime"])[11:19]  # Format as MM:SS.sss
-        driver2_time = str(driver2_lap["LapTime"])[11:19]
-        
         # Get circuit info for corner markers
         circuit_info = session.get_circuit_info()
         
@@ -195,21 +281,21 @@ class TelemetryService:
                 "name": driver1,
                 "color": driver1_color,
                 "lapTime": driver1_time,
-                "distance": driver1_tel['Distance'].tolist(),
-                "speed": driver1_tel['Speed'].tolist(),
-                "throttle": driver1_tel['Throttle'].tolist(),
-                "brake": driver1_tel['Brake'].tolist() if 'Brake' in driver1_tel else None,
-                "drs": driver1_tel['DRS'].tolist() if 'DRS' in driver1_tel else None
+                "distance": driver1_tel['Distance'],
+                "speed": driver1_tel['Speed'],
+                "throttle": driver1_tel['Throttle'],
+                "brake": driver1_tel.get('Brake'),
+                "drs": driver1_tel.get('DRS')
             },
             "driver2": {
                 "name": driver2,
                 "color": driver2_color,
                 "lapTime": driver2_time,
-                "distance": driver2_tel['Distance'].tolist(),
-                "speed": driver2_tel['Speed'].tolist(),
-                "throttle": driver2_tel['Throttle'].tolist(),
-                "brake": driver2_tel['Brake'].tolist() if 'Brake' in driver2_tel else None,
-                "drs": driver2_tel['DRS'].tolist() if 'DRS' in driver2_tel else None
+                "distance": driver2_tel['Distance'],
+                "speed": driver2_tel['Speed'],
+                "throttle": driver2_tel['Throttle'],
+                "brake": driver2_tel.get('Brake'),
+                "drs": driver2_tel.get('DRS')
             },
             "circuit": {
                 "corners": [
@@ -238,26 +324,25 @@ class TelemetryService:
         Returns:
             dict: Gear shift data for interactive visualization
         """
-        lap = self.get_driver_fastest_lap(session, driver)
-        tel = lap.get_telemetry()
+        lap_time, tel = self.get_lap_telemetry(session, driver)
         
         # Get driver colors using our custom color mapping
-        driver_colors = get_color_mapping(session)['drivers']
+        driver_colors = self.get_driver_colors(session)
         
         # Return structured data
         return {
             "driver": {
                 "name": driver,
                 "color": driver_colors.get(driver, 'white'),
-                "lapTime": str(lap["LapTime"])[11:19]
+                "lapTime": lap_time
             },
             "track": {
-                "x": tel['X'].tolist(),
-                "y": tel['Y'].tolist()
+                "x": tel['X'],
+                "y": tel['Y']
             },
-            "gears": tel['nGear'].tolist(),
-            "speed": tel['Speed'].tolist(),
-            "distance": tel['Distance'].tolist() if 'Distance' in tel else None,
+            "gears": tel['nGear'],
+            "speed": tel['Speed'],
+            "distance": tel.get('Distance'),
             "session": {
                 "name": session.event['EventName'],
                 "year": session.event.year
@@ -282,18 +367,24 @@ class TelemetryService:
         # If no drivers specified, use the top 3 fastest
         if not drivers:
             laps = session.laps.pick_quicklaps()
-            fastest_laps = laps.groupby('Driver')['LapTime'].min().sort_values().index[:3]
-            drivers = fastest_laps.tolist()
+            drivers = laps.groupby('Driver', sort=False)['LapTime'].min().nsmallest(3).index.tolist()
         
         # Limit to 3 drivers for clarity
         drivers = drivers[:3]
         
-        # Get telemetry data for each driver
-        for driver in drivers:
+        def load_driver(driver):
+            lap = self.get_driver_fastest_lap(session, driver)
+            telemetry = lap.get_telemetry()
+            telemetry['Driver'] = driver
+            return lap, telemetry
+        
+        # Get telemetry data for each driver in parallel
+        futures = [(driver, driver_pool.submit(load_driver, driver)) for driver in drivers]
+        driver_colors = self.get_driver_colors(session)
+        
+        for driver, future in futures:
             try:
-                lap = self.get_driver_fastest_lap(session, driver)
-                telemetry = lap.get_telemetry()
-                telemetry['Driver'] = driver
+                lap, telemetry = future.result()
                 mini_sectors_list.append(telemetry)
                 
                 # Gather driver info
@@ -303,10 +394,10 @@ class TelemetryService:
                     'Sector1': lap['Sector1Time'],
                     'Sector2': lap['Sector2Time'],
                     'Sector3': lap['Sector3Time'],
-                    'TeamColour': get_color_mapping(session)['drivers'].get(driver, 'white')
+                    'TeamColour': driver_colors.get(driver, 'white')
                 }
             except Exception as e:
-                logger.error(f"Error getting telemetry for driver {driver}: {e}")
+                logger.error("Error getting telemetry for driver %s: %s", driver, e)
         
         if not mini_sectors_list:
             logger.error("No valid telemetry data found for any driver")
@@ -320,63 +411,42 @@ class TelemetryService:
                 }
             }
         
-        # Create mini-sectors
-        analyzer = MiniSectorAnalyzer(pd.concat(mini_sectors_list), num_mini_sectors)
-        mini_sectors = analyzer.create_mini_sectors()
-        
         # Find fastest driver per mini-sector and get all processed telemetry
-        fastest_per_mini_sector, all_mini_sectors = analyzer.find_fastest_drivers(mini_sectors_list)
+        analyzer = MiniSectorAnalyzer(pd.concat(mini_sectors_list, ignore_index=True), num_mini_sectors)
+        fastest_per_mini_sector, all_mini_sectors = analyzer.find_fastest_drivers()
         
         # Get track coordinates from the first driver's lap
         lap = session.laps.pick_drivers(drivers[0]).pick_fastest()
         x = lap.telemetry['X'].values
         y = lap.telemetry['Y'].values
         
+        # Keep only the fastest driver's samples in each mini-sector, in one vectorized pass
+        fastest = fastest_per_mini_sector.set_index('MiniSector')
+        winner = all_mini_sectors['MiniSector'].map(fastest['Driver'])
+        dominant = all_mini_sectors[all_mini_sectors['Driver'] == winner]
+        if 'X' in dominant and 'Y' in dominant:
+            dominant = dominant.dropna(subset=['X', 'Y'])
+        else:
+            dominant = dominant.iloc[0:0]
+        
+        # Plain dict lookups for the per-sector loop instead of label-based .at access
+        fastest_by_sector = fastest['Driver'].to_dict()
+        time_by_sector = fastest['TimeSpent'].to_dict()
+        
         # Create mini-sector data
         mini_sector_data = []
-        for minisector in range(num_mini_sectors):
-            try:
-                # Get data for this mini-sector
-                sector_data = all_mini_sectors[all_mini_sectors['MiniSector'] == minisector]
-                
-                if not sector_data.empty:
-                    # Find the fastest driver for this mini-sector
-                    fastest_driver_rows = fastest_per_mini_sector[
-                        fastest_per_mini_sector['MiniSector'] == minisector
-                    ]
-                    
-                    if not fastest_driver_rows.empty:
-                        fastest_driver = fastest_driver_rows['Driver'].values[0]
-                        
-                        # Get only this driver's data for this mini-sector
-                        driver_sector_data = sector_data[sector_data['Driver'] == fastest_driver]
-                        
-                        # Get coordinates for this mini-sector
-                        if not driver_sector_data.empty and 'X' in driver_sector_data and 'Y' in driver_sector_data:
-                            # Filter out any NaN values
-                            valid_data = driver_sector_data.dropna(subset=['X', 'Y'])
-                            
-                            if not valid_data.empty:
-                                sector_x = valid_data['X'].tolist()
-                                sector_y = valid_data['Y'].tolist()
-                                
-                                # Get time spent in this mini-sector
-                                time_spent = fastest_driver_rows['TimeSpent'].values[0]
-                                
-                                # Only add if we have valid coordinates
-                                if sector_x and sector_y and len(sector_x) == len(sector_y) and not np.isnan(sector_x).any() and not np.isnan(sector_y).any():
-                                    mini_sector_data.append({
-                                        'id': int(minisector),
-                                        'driver': str(fastest_driver),
-                                        'color': get_driver_colors(session).get(fastest_driver, 'white'),
-                                        'time': str(time_spent),
-                                        'coordinates': {
-                                            'x': sector_x,
-                                            'y': sector_y
-                                        }
-                                    })
-            except Exception as e:
-                logger.error(f"Error processing mini-sector {minisector}: {e}")
+        for minisector, sector_data in dominant.groupby('MiniSector', sort=True):
+            fastest_driver = fastest_by_sector[minisector]
+            mini_sector_data.append({
+                'id': int(minisector),
+                'driver': str(fastest_driver),
+                'color': driver_colors.get(fastest_driver, 'white'),
+                'time': str(time_by_sector[minisector].to_timedelta64()),
+                'coordinates': {
+                    'x': sector_data['X'].to_numpy(),
+                    'y': sector_data['Y'].to_numpy()
+                }
+            })
         
         # Return structured data
         return {
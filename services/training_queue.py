@@ -0,0 +1,173 @@
+"""
+Background queue for model training jobs.
+"""
+
+import glob
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger('f1webapp')
+
+# Job ids are uuid4 hex strings; anything else cannot name a job file
+JOB_ID_RE = re.compile(r'[0-9a-f]{32}')
+
+class TrainingQueue:
+    """
+    Runs model training jobs one at a time on a background thread.
+    
+    Submitting the same years and races while an identical job is still
+    waiting returns the waiting job instead of queueing another run.
+    
+    Job state is kept as one JSON file per job in jobs_dir, so a job queued
+    by one server worker process can be looked up from any other. Finished
+    jobs are kept for JOB_TTL seconds, up to MAX_FINISHED_JOBS.
+    """
+    
+    # Seconds a finished job's status stays available (1 hour)
+    JOB_TTL = 60 * 60
+    
+    # Maximum number of finished jobs kept for status lookups
+    MAX_FINISHED_JOBS = 100
+    
+    def __init__(self, train_fn: Callable[[list, list], Any], jobs_dir: str):
+        """
+        Initialize the queue and start its worker thread.
+        
+        Args:
+            train_fn: Function called as train_fn(years, races) for each job
+            jobs_dir: Directory the job state files are kept in
+        """
+        self.train_fn = train_fn
+        self.jobs_dir = jobs_dir
+        self.queue = queue.Queue()
+        self.pending = {}
+        self.lock = threading.Lock()
+        
+        os.makedirs(jobs_dir, exist_ok=True)
+        
+        self.worker = threading.Thread(target=self._run, name='training-queue', daemon=True)
+        self.worker.start()
+    
+    def submit(self, years: list, races: list) -> str:
+        """
+        Queue a training job, reusing an identical job that has not started yet.
+        
+        Args:
+            years: Years to train on
+            races: Races to train on
+        
+        Returns:
+            str: The job id
+        """
+        key = (tuple(years), tuple(races))
+        
+        with self.lock:
+            self._evict_finished()
+            job_id = self.pending.get(key)
+            if job_id is None:
+                job_id = uuid.uuid4().hex
+                job = {
+                    'id': job_id,
+                    'status': 'queued',
+                    'years': list(years),
+                    'races': list(races),
+                    'error': None,
+                    'finished_at': None
+                }
+                self._write_job(job)
+                self.pending[key] = job_id
+                self.queue.put((key, job))
+                logger.info("Queued training job %s for %s %s", job_id, years, races)
+            else:
+                logger.info("Coalesced training request into pending job %s", job_id)
+        
+        return job_id
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the current state of a job.
+        
+        Args:
+            job_id: The job id returned by submit()
+        
+        Returns:
+            dict: The job state, or None if the id is unknown
+        """
+        if not JOB_ID_RE.fullmatch(job_id):
+            return None
+        
+        return self._read_job(self._job_path(job_id))
+    
+    def _job_path(self, job_id):
+        """Get the path of a job's state file."""
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+    
+    def _read_job(self, path):
+        """Read a job state file, or return None if it is gone."""
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def _write_job(self, job):
+        """Write a job state file, replacing it atomically so readers never see a partial file."""
+        path = self._job_path(job['id'])
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(job, f)
+        os.replace(f"{path}.tmp", path)
+    
+    def _run(self):
+        """Worker loop: train each queued job in order."""
+        while True:
+            key, job = self.queue.get()
+            
+            with self.lock:
+                # Requests arriving from now on need a fresh run
+                self.pending.pop(key, None)
+                job['status'] = 'running'
+                self._write_job(job)
+            
+            try:
+                self.train_fn(job['years'], job['races'])
+                status, error = 'completed', None
+            except Exception as e:
+                logger.error("Training job %s failed: %s", job['id'], e, exc_info=True)
+                status, error = 'failed', "Training failed"
+            
+            with self.lock:
+                job['status'] = status
+                job['error'] = error
+                job['finished_at'] = time.time()
+                self._write_job(job)
+                self._evict_finished()
+            
+            self.queue.task_done()
+    
+    def _evict_finished(self):
+        """Delete finished jobs past their TTL or beyond the cap. Call with the lock held."""
+        finished = []
+        for path in glob.glob(os.path.join(self.jobs_dir, '*.json')):
+            job = self._read_job(path)
+            if job and job.get('finished_at') is not None:
+                finished.append((job['finished_at'], path))
+        
+        finished.sort()
+        cutoff = time.time() - self.JOB_TTL
+        excess = len(finished) - self.MAX_FINISHED_JOBS
+        
+        for i, (finished_at, path) in enumerate(finished):
+            if finished_at > cutoff and i >= excess:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Another worker process evicted it first
+                pass
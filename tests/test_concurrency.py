@@ -0,0 +1,105 @@
+import threading
+import unittest
+from utils.concurrency import single_flight
+
+class TestSingleFlight(unittest.TestCase):
+
+    def run_concurrently(self, func, arg, callers=3):
+        # Call func from several threads at once and collect each caller's outcome
+        outcomes = [None] * callers
+
+        def call(index):
+            try:
+                outcomes[index] = ('result', func(arg))
+            except Exception as e:
+                outcomes[index] = ('error', e)
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        return outcomes
+
+    def test_concurrent_calls_share_one_result(self):
+        calls = []
+        release = threading.Event()
+
+        @single_flight
+        def load(key):
+            calls.append(key)
+            release.wait(timeout=5)
+            return [key]
+
+        # Hold the leader until the followers have had time to join it
+        threading.Timer(0.2, release.set).start()
+        outcomes = self.run_concurrently(load, 'a')
+
+        # Assert that the function ran once and every caller got the same object
+        self.assertEqual(calls, ['a'])
+        results = [value for kind, value in outcomes]
+        self.assertTrue(all(kind == 'result' for kind, _ in outcomes))
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_exception_propagates_to_every_caller(self):
+        calls = []
+        release = threading.Event()
+
+        @single_flight
+        def load(key):
+            calls.append(key)
+            release.wait(timeout=5)
+            raise ValueError('load failed')
+
+        threading.Timer(0.2, release.set).start()
+        outcomes = self.run_concurrently(load, 'a')
+
+        # Assert that every caller saw the leader's exception
+        self.assertEqual(len(calls), 1)
+        for kind, value in outcomes:
+            self.assertEqual(kind, 'error')
+            self.assertIsInstance(value, ValueError)
+
+    def test_different_arguments_run_separately(self):
+        calls = []
+
+        @single_flight
+        def load(key):
+            calls.append(key)
+            return key
+
+        self.assertEqual(load('a'), 'a')
+        self.assertEqual(load('b'), 'b')
+        self.assertEqual(calls, ['a', 'b'])
+
+    def test_result_is_not_cached_after_call(self):
+        calls = []
+
+        @single_flight
+        def load(key):
+            calls.append(key)
+            return key
+
+        load('a')
+        load('a')
+
+        # Assert that sequential calls each run the function
+        self.assertEqual(calls, ['a', 'a'])
+
+    def test_failed_call_does_not_poison_later_calls(self):
+        attempts = []
+
+        @single_flight
+        def load(key):
+            attempts.append(key)
+            if len(attempts) == 1:
+                raise ValueError('first attempt fails')
+            return key
+
+        with self.assertRaises(ValueError):
+            load('a')
+        self.assertEqual(load('a'), 'a')
+
+if __name__ == '__main__':
+    unittest.main()
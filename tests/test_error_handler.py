@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from werkzeug.exceptions import NotFound
+from api.utils.error_handler import APIError, route_errors
+
+class TestRouteErrors(unittest.TestCase):
+
+    def test_sync_view_result_is_returned(self):
+        @route_errors('getting events for year {year}')
+        def view(year):
+            return {'year': year}
+
+        self.assertEqual(view(year=2023), {'year': 2023})
+
+    @patch('api.utils.error_handler.error_response')
+    def test_sync_view_error_becomes_500(self, mock_error_response):
+        mock_error_response.return_value = ('response', 500)
+
+        @route_errors('getting events for year {year}')
+        def view(year):
+            raise ValueError('database password is hunter2')
+
+        # Call the view and check the error response it built
+        result = view(year=2023)
+
+        self.assertEqual(result, ('response', 500))
+        mock_error_response.assert_called_once_with('Error getting events for year 2023', 500)
+
+        # Assert that the exception text is not sent to the client
+        message = mock_error_response.call_args[0][0]
+        self.assertNotIn('hunter2', message)
+
+    @patch('api.utils.error_handler.error_response')
+    def test_async_view_error_becomes_500(self, mock_error_response):
+        mock_error_response.return_value = ('response', 500)
+
+        @route_errors('loading session {year} {event} {session}')
+        async def view(year, event, session):
+            raise RuntimeError('upstream timeout')
+
+        result = asyncio.run(view(year=2023, event='Monaco', session='R'))
+
+        self.assertEqual(result, ('response', 500))
+        mock_error_response.assert_called_once_with('Error loading session 2023 Monaco R', 500)
+
+    def test_async_view_result_is_returned(self):
+        @route_errors('getting the schedule')
+        async def view():
+            return 'ok'
+
+        self.assertEqual(asyncio.run(view()), 'ok')
+
+    def test_api_error_is_reraised(self):
+        @route_errors('getting the schedule')
+        def view():
+            raise APIError('Invalid year: abc', 400)
+
+        # Assert that APIErrors reach the error handlers unchanged
+        with self.assertRaises(APIError) as context:
+            view()
+        self.assertEqual(context.exception.status_code, 400)
+
+    def test_async_http_exception_is_reraised(self):
+        @route_errors('getting the schedule')
+        async def view():
+            raise NotFound()
+
+        with self.assertRaises(NotFound):
+            asyncio.run(view())
+
+if __name__ == '__main__':
+    unittest.main()
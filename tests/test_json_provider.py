@@ -0,0 +1,91 @@
+import decimal
+import unittest
+from datetime import date, datetime, timezone
+import numpy as np
+from flask import Flask
+from api.utils.json_provider import OrjsonProvider
+
+class TestOrjsonProvider(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.provider = OrjsonProvider(self.app)
+
+    def test_numpy_arrays_and_scalars(self):
+        data = {
+            'speed': np.array([280.5, 301.25], dtype=np.float64),
+            'gear': np.array([7, 8], dtype=np.int8),
+            'lap': np.int64(12),
+            'time': np.float32(0.5)
+        }
+
+        self.assertEqual(
+            self.provider.loads(self.provider.dumps(data)),
+            {'gear': [7, 8], 'lap': 12, 'speed': [280.5, 301.25], 'time': 0.5}
+        )
+
+    def test_datetimes_use_http_date(self):
+        # Same format as Flask's default provider
+        data = {
+            'naive': datetime(2023, 3, 5, 15, 0, 0),
+            'aware': datetime(2023, 3, 5, 15, 0, 0, tzinfo=timezone.utc),
+            'date': date(2023, 3, 5)
+        }
+
+        self.assertEqual(self.provider.loads(self.provider.dumps(data)), {
+            'aware': 'Sun, 05 Mar 2023 15:00:00 GMT',
+            'date': 'Sun, 05 Mar 2023 00:00:00 GMT',
+            'naive': 'Sun, 05 Mar 2023 15:00:00 GMT'
+        })
+
+    def test_decimal_is_a_string(self):
+        self.assertEqual(self.provider.dumps(decimal.Decimal('1.50')), '"1.50"')
+
+    def test_unsupported_type_raises(self):
+        with self.assertRaises(TypeError):
+            self.provider.dumps(object())
+
+    def test_sort_keys(self):
+        data = {'b': 1, 'a': 2}
+
+        self.assertEqual(self.provider.dumps(data), '{"a":2,"b":1}')
+
+        # Keys keep insertion order when sorting is off
+        self.provider.sort_keys = False
+        self.assertEqual(self.provider.dumps(data), '{"b":1,"a":2}')
+
+    def test_compact(self):
+        data = {'a': [1, 2]}
+
+        self.provider.compact = True
+        self.assertNotIn('\n', self.provider.dumps(data))
+
+        self.provider.compact = False
+        self.assertIn('\n', self.provider.dumps(data))
+
+    def test_compact_none_follows_debug(self):
+        data = {'a': [1, 2]}
+
+        self.app.debug = False
+        self.assertNotIn('\n', self.provider.dumps(data))
+
+        self.app.debug = True
+        self.assertIn('\n', self.provider.dumps(data))
+
+    def test_non_string_keys(self):
+        self.assertEqual(self.provider.dumps({1: 'VER', 44: 'HAM'}), '{"1":"VER","44":"HAM"}')
+
+    def test_dumps_bytes_matches_dumps(self):
+        data = {'laps': np.arange(3), 'driver': 'VER'}
+
+        self.assertEqual(self.provider.dumps_bytes(data), self.provider.dumps(data).encode('utf-8'))
+
+    def test_response(self):
+        with self.app.app_context():
+            response = self.provider.response({'success': True})
+
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(response.get_data(), b'{"success":true}')
+
+if __name__ == '__main__':
+    unittest.main()
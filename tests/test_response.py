@@ -0,0 +1,71 @@
+import json
+import unittest
+from flask import Flask
+from api.utils.json_provider import OrjsonProvider
+from api.utils.response import ndjson_response, stream_success_response, success_response
+
+class TestStreamingResponses(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.json = OrjsonProvider(self.app)
+        self.app.json.sort_keys = False
+        self.app.json.compact = True
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        self.context.pop()
+
+    def test_stream_matches_success_response(self):
+        data = {
+            'year': 2023,
+            'event': 'Monaco',
+            'laps': [{'lap': i, 'time': 74.5 + i / 10} for i in range(1203)]
+        }
+
+        streamed, status = stream_success_response(data, 'laps', batch_size=500)
+        expected, _ = success_response(data)
+
+        # Assert that the joined chunks decode to the same document
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(streamed.get_data()), json.loads(expected.get_data()))
+
+    def test_stream_sends_items_in_batches(self):
+        data = {'laps': list(range(1203))}
+
+        streamed, _ = stream_success_response(data, 'laps', batch_size=500)
+        chunks = list(streamed.response)
+
+        # Head, three batches of items and the closing brackets
+        self.assertEqual(len(chunks), 5)
+
+    def test_stream_with_empty_list(self):
+        data = {'year': 2023, 'laps': []}
+
+        streamed, _ = stream_success_response(data, 'laps')
+
+        self.assertEqual(json.loads(streamed.get_data()), {'success': True, 'data': {'year': 2023, 'laps': []}})
+
+    def test_ndjson_line_count_across_batches(self):
+        # Sizes around the first batch (50) and the later batches (500)
+        for count in (0, 1, 49, 50, 51, 549, 550, 551, 1100):
+            items = [{'index': i} for i in range(count)]
+
+            response, _ = ndjson_response(items, first_batch=50, batch_size=500)
+            lines = response.get_data().splitlines()
+
+            self.assertEqual(len(lines), count)
+            self.assertEqual([json.loads(line) for line in lines], items)
+
+    def test_ndjson_first_batch_is_sent_alone(self):
+        items = [{'index': i} for i in range(600)]
+
+        response, _ = ndjson_response(items, first_batch=50, batch_size=500)
+        chunks = list(response.response)
+
+        self.assertEqual(chunks[0].count(b'\n'), 50)
+        self.assertEqual([chunk.count(b'\n') for chunk in chunks[1:]], [500, 50])
+
+if __name__ == '__main__':
+    unittest.main()
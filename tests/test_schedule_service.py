@@ -0,0 +1,113 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pandas as pd
+from services.schedule_service import ScheduleService
+
+# Whole seconds, as session start times are compared at second resolution
+NOW = datetime(2023, 7, 6, 12, 0, 0)
+
+def make_race(name, first_start, last_start):
+    return {
+        'round': 1,
+        'name': name,
+        'events': [
+            {'type': 'Practice 1', 'startTime': first_start.isoformat()},
+            {'type': 'Race', 'startTime': last_start.isoformat()}
+        ]
+    }
+
+def original_status(race, now):
+    # The bucketing the events-by-status route did before the index was added
+    first_event_time = datetime.fromisoformat(race['events'][0]['startTime'])
+    last_event_time = datetime.fromisoformat(race['events'][-1]['startTime'])
+
+    if last_event_time < now - timedelta(days=1):
+        return 'past'
+    elif first_event_time <= now + timedelta(days=2):
+        return 'current'
+    return 'future'
+
+class TestScheduleServiceStatus(unittest.TestCase):
+
+    @patch('services.schedule_service.enable_cache')
+    def setUp(self, mock_enable_cache):
+        self.service = ScheduleService()
+
+    def get_statuses(self, races):
+        with patch.object(ScheduleService, 'get_schedule', return_value={'year': 2023, 'races': races}), \
+             patch('services.schedule_service.datetime') as mock_datetime:
+            mock_datetime.now.return_value = NOW
+            result = self.service.get_events_by_status(2023)
+
+        return {
+            race['name']: status
+            for status in ('past', 'current', 'future')
+            for race in result[status]
+        }
+
+    def test_last_session_at_past_edge(self):
+        one_day_ago = NOW - timedelta(days=1)
+        second = timedelta(seconds=1)
+        races = [
+            make_race('before', one_day_ago - timedelta(days=2), one_day_ago - second),
+            make_race('at', one_day_ago - timedelta(days=2), one_day_ago),
+            make_race('after', one_day_ago - timedelta(days=2), one_day_ago + second)
+        ]
+
+        statuses = self.get_statuses(races)
+
+        # Only a last session strictly more than a day old is past
+        self.assertEqual(statuses, {'before': 'past', 'at': 'current', 'after': 'current'})
+
+    def test_first_session_at_future_edge(self):
+        in_two_days = NOW + timedelta(days=2)
+        second = timedelta(seconds=1)
+        races = [
+            make_race('before', in_two_days - second, in_two_days + timedelta(days=2)),
+            make_race('at', in_two_days, in_two_days + timedelta(days=2)),
+            make_race('after', in_two_days + second, in_two_days + timedelta(days=2))
+        ]
+
+        statuses = self.get_statuses(races)
+
+        # A first session exactly two days away is already current
+        self.assertEqual(statuses, {'before': 'current', 'at': 'current', 'after': 'future'})
+
+    def test_matches_original_buckets(self):
+        offsets = [timedelta(days=d, seconds=s) for d in (-3, -1, 0, 2, 4) for s in (-1, 0, 1)]
+        races = [
+            make_race(f"race{i}-{j}", NOW + first, NOW + last)
+            for i, first in enumerate(offsets)
+            for j, last in enumerate(offsets)
+            if first <= last
+        ]
+
+        statuses = self.get_statuses(races)
+
+        for race in races:
+            self.assertEqual(statuses[race['name']], original_status(race, NOW), race['name'])
+
+    def test_races_without_sessions_are_skipped(self):
+        races = [{'round': 1, 'name': 'empty', 'events': []}]
+
+        self.assertEqual(self.get_statuses(races), {})
+
+    def test_next_event_skips_event_happening_now(self):
+        schedule = pd.DataFrame({
+            'RoundNumber': [1, 2, 3],
+            'EventName': ['Earlier Grand Prix', 'Current Grand Prix', 'Next Grand Prix'],
+            'EventDate': pd.to_datetime([NOW - timedelta(days=7), NOW, NOW + timedelta(days=7)]),
+            'Country': ['Bahrain', 'Monaco', 'Spain'],
+            'Location': ['Sakhir', 'Monaco', 'Barcelona']
+        })
+
+        with patch.object(ScheduleService, '_load_schedule', return_value=schedule), \
+             patch.object(pd.Timestamp, 'now', return_value=pd.Timestamp(NOW)):
+            next_event = self.service.get_next_event()
+
+        # An event dated exactly now is not in the future, as with the original '>' filter
+        self.assertEqual(next_event['race']['name'], 'Next Grand Prix')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from services.training_queue import TrainingQueue
+
+class TestTrainingQueue(unittest.TestCase):
+
+    def setUp(self):
+        # Block the worker on its first job so later submissions stay queued
+        self.release = threading.Event()
+        self.calls = []
+
+        def train(years, races):
+            self.calls.append((years, races))
+            self.release.wait(timeout=5)
+            if races == ['Broken']:
+                raise ValueError('no laps')
+
+        self.jobs_dir = tempfile.mkdtemp()
+        self.training_queue = TrainingQueue(train, self.jobs_dir)
+
+    def tearDown(self):
+        self.release.set()
+        self.training_queue.queue.join()
+        shutil.rmtree(self.jobs_dir)
+
+    def wait_for_jobs(self):
+        self.release.set()
+        self.training_queue.queue.join()
+
+    def test_identical_pending_jobs_are_coalesced(self):
+        # The first job starts running; the next two wait behind it
+        self.training_queue.submit([2023], ['Monaco'])
+        first = self.training_queue.submit([2023], ['Bahrain'])
+        second = self.training_queue.submit([2023], ['Bahrain'])
+
+        self.assertEqual(first, second)
+
+        self.wait_for_jobs()
+
+        # Assert that the coalesced job trained once
+        self.assertEqual(self.calls.count(([2023], ['Bahrain'])), 1)
+
+    def test_different_jobs_are_not_coalesced(self):
+        first = self.training_queue.submit([2023], ['Monaco'])
+        second = self.training_queue.submit([2024], ['Monaco'])
+
+        self.assertNotEqual(first, second)
+
+    def test_job_status_is_reported(self):
+        job_id = self.training_queue.submit([2023], ['Monaco'])
+        failed_id = self.training_queue.submit([2023], ['Broken'])
+
+        self.assertIn(self.training_queue.get_job(job_id)['status'], ('queued', 'running'))
+
+        self.wait_for_jobs()
+
+        self.assertEqual(self.training_queue.get_job(job_id)['status'], 'completed')
+        failed = self.training_queue.get_job(failed_id)
+        self.assertEqual(failed['status'], 'failed')
+        # Assert that the exception text is only logged, not reported
+        self.assertEqual(failed['error'], 'Training failed')
+
+    def test_unknown_job_is_none(self):
+        self.assertIsNone(self.training_queue.get_job('missing'))
+
+    def test_finished_jobs_are_capped(self):
+        self.training_queue.MAX_FINISHED_JOBS = 2
+        job_ids = [self.training_queue.submit([2023], [race]) for race in ('Monaco', 'Bahrain', 'Spain')]
+
+        self.wait_for_jobs()
+
+        # Assert that only the most recently finished jobs are kept
+        self.assertIsNone(self.training_queue.get_job(job_ids[0]))
+        self.assertIsNotNone(self.training_queue.get_job(job_ids[1]))
+        self.assertIsNotNone(self.training_queue.get_job(job_ids[2]))
+
+    def test_job_is_visible_from_another_queue(self):
+        # A queue in another server process shares the jobs directory
+        job_id = self.training_queue.submit([2023], ['Monaco'])
+        other_queue = TrainingQueue(lambda years, races: None, self.jobs_dir)
+
+        self.wait_for_jobs()
+
+        self.assertEqual(other_queue.get_job(job_id)['status'], 'completed')
+
+    def test_malformed_job_id_is_none(self):
+        self.assertIsNone(self.training_queue.get_job('../../etc/passwd'))
+
+    @patch('services.training_queue.time.time')
+    def test_finished_jobs_expire(self, mock_time):
+        mock_time.return_value = 1000.0
+        job_id = self.training_queue.submit([2023], ['Monaco'])
+
+        self.wait_for_jobs()
+        self.assertIsNotNone(self.training_queue.get_job(job_id))
+
+        # Move past the TTL; eviction runs on the next submission
+        mock_time.return_value = 1000.0 + TrainingQueue.JOB_TTL + 1
+        self.training_queue.submit([2024], ['Monaco'])
+
+        self.assertIsNone(self.training_queue.get_job(job_id))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from api.utils.validation import MAX_DRIVERS, is_value_list, parse_driver_list
+
+class TestParseDriverList(unittest.TestCase):
+
+    def test_valid_codes_are_kept_in_order(self):
+        self.assertEqual(parse_driver_list('VER,HAM,LEC'), ['VER', 'HAM', 'LEC'])
+
+    def test_invalid_codes_are_dropped(self):
+        # Lowercase, wrong length and empty entries are not driver codes
+        self.assertEqual(parse_driver_list('VER,ham,HAMI,,LE,NOR'), ['VER', 'NOR'])
+
+    def test_duplicates_keep_first_occurrence(self):
+        self.assertEqual(parse_driver_list('HAM,VER,HAM,VER'), ['HAM', 'VER'])
+
+    def test_list_is_capped(self):
+        drivers = 'VER,HAM,LEC,NOR,SAI,RUS,ALO,PIA'
+
+        self.assertEqual(len(parse_driver_list(drivers)), MAX_DRIVERS)
+        self.assertEqual(parse_driver_list(drivers, limit=2), ['VER', 'HAM'])
+
+    def test_cap_applies_after_dedupe(self):
+        # Duplicates do not use up the limit
+        self.assertEqual(parse_driver_list('VER,VER,VER,HAM', limit=2), ['VER', 'HAM'])
+
+    def test_empty_parameter_gives_empty_list(self):
+        self.assertEqual(parse_driver_list(''), [])
+
+class TestIsValueList(unittest.TestCase):
+
+    def test_lists_of_ints_and_strings_are_accepted(self):
+        self.assertTrue(is_value_list([2023, 2024]))
+        self.assertTrue(is_value_list(['Monaco', 'Bahrain']))
+
+    def test_other_values_are_rejected(self):
+        # A bare string would otherwise be split into characters
+        for value in (2023, '2023', [], None, {'year': 2023}, [True], [[2023]], [None]):
+            self.assertFalse(is_value_list(value), value)
+
+if __name__ == '__main__':
+    unittest.main()
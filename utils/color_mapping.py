@@ -117,25 +117,25 @@ def get_driver_color(driver_code: str, session: Optional[fastf1.core.Session] =
                 if driver_code in driver_mapping:
                     return driver_mapping[driver_code]
             except (AttributeError, TypeError) as e:
-                logger.debug(f"Could not use get_driver_color_mapping: {e}")
+                logger.debug("Could not use get_driver_color_mapping: %s", e)
                 
                 # Try using driver_color directly (older FastF1 versions)
                 try:
                     if hasattr(plotting, 'driver_color') and driver_code in plotting.driver_color:
                         return plotting.driver_color[driver_code]
                 except Exception as e:
-                    logger.debug(f"Could not use plotting.driver_color: {e}")
+                    logger.debug("Could not use plotting.driver_color: %s", e)
         
         # Fall back to our default mapping
         if driver_code in DEFAULT_DRIVER_COLORS:
             return DEFAULT_DRIVER_COLORS[driver_code]
         
         # If all else fails, return a default color
-        logger.warning(f"No color found for driver {driver_code}, using default")
+        logger.warning("No color found for driver %s, using default", driver_code)
         return "#333333"
         
     except Exception as e:
-        logger.error(f"Error getting driver color for {driver_code}: {e}")
+        logger.error("Error getting driver color for %s: %s", driver_code, e)
         return "#333333"
 
 def get_team_color(team_name: str, session: Optional[fastf1.core.Session] = None) -> str:
@@ -158,25 +158,25 @@ def get_team_color(team_name: str, session: Optional[fastf1.core.Session] = None
                 if team_name in team_mapping:
                     return team_mapping[team_name]
             except (AttributeError, TypeError) as e:
-                logger.debug(f"Could not use get_team_color_mapping: {e}")
+                logger.debug("Could not use get_team_color_mapping: %s", e)
                 
                 # Try using team_color directly (older FastF1 versions)
                 try:
                     if hasattr(plotting, 'team_color') and team_name in plotting.team_color:
                         return plotting.team_color[team_name]
                 except Exception as e:
-                    logger.debug(f"Could not use plotting.team_color: {e}")
+                    logger.debug("Could not use plotting.team_color: %s", e)
         
         # Fall back to our default mapping
         if team_name in DEFAULT_TEAM_COLORS:
             return DEFAULT_TEAM_COLORS[team_name]
         
         # If all else fails, return a default color
-        logger.warning(f"No color found for team {team_name}, using default")
+        logger.warning("No color found for team %s, using default", team_name)
         return "#333333"
         
     except Exception as e:
-        logger.error(f"Error getting team color for {team_name}: {e}")
+        logger.error("Error getting team color for %s: %s", team_name, e)
         return "#333333"
 
 def get_color_mapping(session: Optional[fastf1.core.Session] = None) -> Dict[str, Dict[str, str]]:
@@ -211,7 +211,7 @@ def get_color_mapping(session: Optional[fastf1.core.Session] = None) -> Dict[str
                 if hasattr(plotting, 'team_color'):
                     team_colors.update(plotting.team_color)
         except Exception as e:
-            logger.error(f"Error getting color mappings from FastF1: {e}")
+            logger.error("Error getting color mappings from FastF1: %s", e)
     
     # Add our default mappings for any missing entries
     for driver, color in DEFAULT_DRIVER_COLORS.items():
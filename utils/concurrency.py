@@ -0,0 +1,56 @@
+"""
+Utility module for coordinating concurrent work.
+
+This module provides a single-flight decorator so that identical calls made
+at the same time share one execution instead of each doing the work.
+"""
+
+import functools
+import threading
+from concurrent.futures import Future
+
+
+def single_flight(func):
+    """
+    Collapse concurrent calls with the same arguments into one execution.
+
+    The first caller runs the function; callers that arrive while it is
+    still running wait for and share its result (or exception). Nothing is
+    cached once the call finishes.
+
+    Args:
+        func: The function to wrap; its arguments must be hashable
+
+    Returns:
+        function: The wrapped function
+    """
+    inflight = {}
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+
+        with lock:
+            future = inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with lock:
+                inflight.pop(key, None)
+
+    return wrapper
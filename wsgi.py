@@ -0,0 +1,11 @@
+"""
+WSGI entry point for the F1 Web App.
+
+Serve with a threaded WSGI server, e.g.:
+    gunicorn wsgi:app --worker-class gthread --workers 4 --threads 8 --bind 0.0.0.0:5002
+"""
+
+from api.app import create_app
+
+# Create the Flask app (this also enables the FastF1 cache)
+app = create_app()